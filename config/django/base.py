@@ -136,4 +136,6 @@ AUTH_USER_MODEL = 'user.User'
 
 INTEREST_API_URL = os.getenv('INTEREST_API_URL', '').rstrip('/')
 if not INTEREST_API_URL:
-    raise ValueError('INTEREST_API_URL must be set')
\ No newline at end of file
+    raise ValueError('INTEREST_API_URL must be set')
+
+from config.settings.semantic import *
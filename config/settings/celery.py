@@ -2,6 +2,8 @@ from __future__ import absolute_import, unicode_literals
 import os
 from datetime import timedelta
 from celery import Celery
+from celery.signals import worker_process_init
+from django.conf import settings
 from kombu import Queue
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.django.local')
@@ -15,6 +17,8 @@ app.autodiscover_tasks(['ingest.parsers.factroom'])
 QUEUES = {
     'INGEST_FACTROOM': {'name': 'ingest.factroom'},
     'EMBEDDING_NEW_ARTICLES': {'name': 'ingest.semantic'},
+    'VECTOR_INDEX_MAINTENANCE': {'name': 'semantic.maintenance'},
+    'EMBEDDING_BACKFILL': {'name': 'semantic.backfill'},
 }
 QUEUE_DEFAULT_ARGS = {
     'x-max-length': 1,
@@ -24,7 +28,13 @@ QUEUE_DEFAULT_ARGS = {
 app.conf.task_queues = (
     Queue(QUEUES['INGEST_FACTROOM']['name'], queue_arguments=QUEUE_DEFAULT_ARGS),
     Queue(QUEUES['EMBEDDING_NEW_ARTICLES']['name'], queue_arguments=QUEUE_DEFAULT_ARGS),
+    Queue(QUEUES['VECTOR_INDEX_MAINTENANCE']['name'], queue_arguments=QUEUE_DEFAULT_ARGS),
+    # fan-out target for parallel backfill workers, so it must not drop messages
+    Queue(QUEUES['EMBEDDING_BACKFILL']['name']),
 )
+app.conf.task_routes = {
+    'embedding_backfill_worker_task': {'queue': QUEUES['EMBEDDING_BACKFILL']['name']},
+}
 
 app.conf.beat_schedule = {
     'parse_factroom_task_every_6h': {
@@ -36,6 +46,22 @@ app.conf.beat_schedule = {
         'task': 'embedding_new_articles_task',
         'schedule': timedelta(hours=1),
         'options': {'queue': QUEUES['EMBEDDING_NEW_ARTICLES']['name']},
-        'kwargs': {'limit': 1000},
+        'kwargs': {'limit': 1000, 'batch_size': 32},
+    },
+    'vector_index_maintenance': {
+        'task': 'vector_index_maintenance_task',
+        'schedule': timedelta(hours=24),
+        'options': {'queue': QUEUES['VECTOR_INDEX_MAINTENANCE']['name']},
     },
 }
+
+
+def log_worker_memory(**kwargs):
+    # with SEMANTIC_PRELOAD_SHARED the model pages show up as shared, not private
+    import logging
+    from semantic.prefork import process_memory
+    logging.getLogger(__name__).info('Worker process memory: %s', process_memory())
+
+
+if settings.SEMANTIC_PRELOAD_SHARED:
+    worker_process_init.connect(log_worker_memory)
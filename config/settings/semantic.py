@@ -0,0 +1,88 @@
+import os
+
+
+# Query embedding cache: in-process LRU/TTL, optionally backed by a Django CACHES alias
+SEMANTIC_QUERY_CACHE_SIZE = int(os.getenv('SEMANTIC_QUERY_CACHE_SIZE', 1024))
+SEMANTIC_QUERY_CACHE_TTL = int(os.getenv('SEMANTIC_QUERY_CACHE_TTL', 60 * 60))
+SEMANTIC_QUERY_CACHE_BACKEND = os.getenv('SEMANTIC_QUERY_CACHE_BACKEND', '')
+
+# Search result cache, keyed by the ingest corpus version so any content/embedding commit invalidates it
+SEMANTIC_RESULT_CACHE_SIZE = int(os.getenv('SEMANTIC_RESULT_CACHE_SIZE', 512))
+SEMANTIC_RESULT_CACHE_TTL = int(os.getenv('SEMANTIC_RESULT_CACHE_TTL', 10 * 60))
+SEMANTIC_RESULT_CACHE_BACKEND = os.getenv('SEMANTIC_RESULT_CACHE_BACKEND', '')
+
+# Hybrid search: 'two_stage' blends scores over ANN + full-text candidates only, 'exact' scores every row
+SEMANTIC_SEARCH_RETRIEVAL = os.getenv('SEMANTIC_SEARCH_RETRIEVAL', 'two_stage')
+SEMANTIC_SEARCH_CANDIDATES = int(os.getenv('SEMANTIC_SEARCH_CANDIDATES', 100))
+
+# Hybrid scoring: 'linear' = 0.8 * cos_sim + 0.2 * bm25, 'rrf' = reciprocal rank fusion of two top-K lists
+SEMANTIC_SEARCH_SCORING = os.getenv('SEMANTIC_SEARCH_SCORING', 'linear')
+SEMANTIC_SEARCH_RRF_K = int(os.getenv('SEMANTIC_SEARCH_RRF_K', 60))
+SEMANTIC_SEARCH_RRF_PARALLEL = os.getenv('SEMANTIC_SEARCH_RRF_PARALLEL', '0') == '1'
+
+# ANN index on IngestArticleEmbedding.vector, rebuilt with `manage.py rebuild_vector_index`
+SEMANTIC_VECTOR_INDEX = {
+    'method': os.getenv('SEMANTIC_VECTOR_INDEX_METHOD', 'ivfflat'),
+    'm': int(os.getenv('SEMANTIC_VECTOR_INDEX_M', 16)),
+    'ef_construction': int(os.getenv('SEMANTIC_VECTOR_INDEX_EF_CONSTRUCTION', 64)),
+    'lists': int(os.getenv('SEMANTIC_VECTOR_INDEX_LISTS', 100)),
+}
+
+# Per-query recall/latency profiles, applied as SET LOCAL inside the search transaction
+SEMANTIC_SEARCH_PROFILE = os.getenv('SEMANTIC_SEARCH_PROFILE', 'balanced')
+SEMANTIC_SEARCH_PROFILES = {
+    'fast': {'ivfflat.probes': 1, 'hnsw.ef_search': 20},
+    'balanced': {'ivfflat.probes': 10, 'hnsw.ef_search': 64},
+    'exact': {'enable_indexscan': 'off'},
+}
+
+# Rebuild ivfflat when row count grows/shrinks by this factor since the last build
+SEMANTIC_VECTOR_INDEX_REBUILD_DRIFT = float(os.getenv('SEMANTIC_VECTOR_INDEX_REBUILD_DRIFT', 2.0))
+SEMANTIC_VECTOR_INDEX_RECALL_SAMPLE = int(os.getenv('SEMANTIC_VECTOR_INDEX_RECALL_SAMPLE', 50))
+
+# Embedding inference backend: 'torch' (fp32), 'torch-int8' (dynamic int8, CPU) or 'onnx' (onnxruntime, CPU)
+SEMANTIC_EMBEDDING_BACKEND = os.getenv('SEMANTIC_EMBEDDING_BACKEND', 'torch')
+SEMANTIC_EMBEDDING_ONNX_FILE = os.getenv('SEMANTIC_EMBEDDING_ONNX_FILE', 'onnx/model.onnx')
+
+# Micro-batching of concurrent query embeddings (one forward pass per batch)
+SEMANTIC_QUERY_BATCHING = os.getenv('SEMANTIC_QUERY_BATCHING', '1') == '1'
+SEMANTIC_QUERY_BATCH_SIZE = int(os.getenv('SEMANTIC_QUERY_BATCH_SIZE', 32))
+SEMANTIC_QUERY_BATCH_WAIT_MS = float(os.getenv('SEMANTIC_QUERY_BATCH_WAIT_MS', 5))
+
+# Load and warm the embedding model at startup instead of on first use
+SEMANTIC_PRELOAD_MODELS = os.getenv('SEMANTIC_PRELOAD_MODELS', '0') == '1'
+
+# Load the weights in the pre-fork parent so worker processes share them copy-on-write
+SEMANTIC_PRELOAD_SHARED = os.getenv('SEMANTIC_PRELOAD_SHARED', '0') == '1'
+
+# Candidate generation index: 'vector' (float), 'halfvec', 'bit' or 'pca'; compact kinds fetch
+# limit * RERANK_FACTOR candidates and re-rank them with the stored float vectors
+SEMANTIC_SEARCH_VECTOR_INDEX = os.getenv('SEMANTIC_SEARCH_VECTOR_INDEX', 'vector')
+SEMANTIC_SEARCH_RERANK_FACTOR = int(os.getenv('SEMANTIC_SEARCH_RERANK_FACTOR', 4))
+
+# Parallel backfill: the hourly beat task fans out this many claim workers onto the backfill queue;
+# each leases a pool of articles (semantic.EmbeddingClaim, claimed with FOR UPDATE SKIP LOCKED), so workers
+# never embed the same article; a lease older than CLAIM_TTL seconds (crashed worker) is claimed again
+SEMANTIC_EMBEDDING_WORKERS = int(os.getenv('SEMANTIC_EMBEDDING_WORKERS', 1))
+SEMANTIC_EMBEDDING_CLAIM_TTL = int(os.getenv('SEMANTIC_EMBEDDING_CLAIM_TTL', 1800))
+
+# Async search endpoint: query encodings run on a dedicated pool; past MAX_PENDING in flight
+# requests get 503 instead of queueing behind the model
+SEMANTIC_ASYNC_INFERENCE_WORKERS = int(os.getenv('SEMANTIC_ASYNC_INFERENCE_WORKERS', 2))
+SEMANTIC_ASYNC_MAX_PENDING = int(os.getenv('SEMANTIC_ASYNC_MAX_PENDING', 64))
+
+# Batch search API: queries per forward pass + SQL statement, and per request
+SEMANTIC_BATCH_SEARCH_CHUNK = int(os.getenv('SEMANTIC_BATCH_SEARCH_CHUNK', 64))
+SEMANTIC_BATCH_SEARCH_MAX_QUERIES = int(os.getenv('SEMANTIC_BATCH_SEARCH_MAX_QUERIES', 10000))
+
+# Materialised kNN graph (semantic.ArticleNeighbor), built with `manage.py build_knn_graph`;
+# once built, turn on incremental updates from the embedding write paths
+SEMANTIC_KNN_GRAPH = os.getenv('SEMANTIC_KNN_GRAPH', '0') == '1'
+SEMANTIC_KNN_K = int(os.getenv('SEMANTIC_KNN_K', 10))
+
+# Filtered search (site / category subtree / published_at range): subsets estimated at up to this many
+# embedded articles are scanned exactly, larger ones use an ANN iterative index scan (pgvector >= 0.8)
+SEMANTIC_FILTER_EXACT_MAX_ROWS = int(os.getenv('SEMANTIC_FILTER_EXACT_MAX_ROWS', 20000))
+
+# Cursor pagination: how many hits of a query can be paged through; the ranked list lives in the result cache
+SEMANTIC_SEARCH_PAGE_DEPTH = int(os.getenv('SEMANTIC_SEARCH_PAGE_DEPTH', 500))
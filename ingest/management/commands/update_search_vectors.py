@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from ingest.services.corpus_version import CorpusVersion
+from ingest.services.search_vector import SearchVectorService
+
+
+class Command(BaseCommand):
+    help = 'Backfill ArticleContent.search_vector (title A + content_text B).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows per UPDATE statement (default: 1000)',
+        )
+        parser.add_argument(
+            '--only-missing',
+            action='store_true',
+            help='Skip rows that already have a search vector',
+        )
+        parser.add_argument(
+            '--config',
+            type=str,
+            default='russian',
+            help='Text search configuration (default: russian)',
+        )
+
+    def handle(self, *args, **options):
+        service = SearchVectorService(config=options['config'])
+
+        self.stdout.write(self.style.NOTICE('Updating search vectors...'))
+        updated = service.backfill(batch_size=options['batch_size'], only_missing=options['only_missing'])
+        if updated:
+            CorpusVersion().bump()
+
+        self.stdout.write(self.style.SUCCESS(f'Done. updated={updated}'))
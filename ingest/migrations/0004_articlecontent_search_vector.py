@@ -0,0 +1,24 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingest', '0003_articlecontent_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articlecontent',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='articlecontent',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='ingest_content_search_gin'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingest', '0004_articlecontent_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE SEQUENCE IF NOT EXISTS ingest_corpus_version',
+            reverse_sql='DROP SEQUENCE IF EXISTS ingest_corpus_version',
+        ),
+    ]
@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils import timezone
 
@@ -79,9 +81,15 @@ class ArticleContent(models.Model):
     content_html = models.TextField(null=True, blank=True)
     content_text = models.TextField(null=True, blank=True)
 
+    # weighted tsvector: article title (A) + content_text (B), see SearchVectorService
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         verbose_name = 'Article Content'
         verbose_name_plural = 'Article Contents'
+        indexes = [
+            GinIndex(fields=['search_vector'], name='ingest_content_search_gin'),
+        ]
 
     def __str__(self) -> str:
         return f'content<{self.article_id}>'
\ No newline at end of file
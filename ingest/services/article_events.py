@@ -0,0 +1,32 @@
+from __future__ import annotations
+from typing import Iterable
+
+from django.db import connection
+
+
+ARTICLE_CHANGED_CHANNEL = 'ingest_article_changed'
+
+
+class ArticleChangeNotifier:
+    '''
+    Announce articles whose embeddable text (title / content_text) changed:
+
+    - One Postgres NOTIFY per article id on ARTICLE_CHANGED_CHANNEL
+    - NOTIFY is transactional: listeners only see it after the persist transaction
+      commits, and never for a rolled back one
+    - Postgres folds duplicate payloads within one transaction
+    '''
+
+    def __init__(self, channel: str = ARTICLE_CHANGED_CHANNEL) -> None:
+        self.channel = channel
+
+    def notify(self, article_ids: Iterable[int]) -> int:
+        ids = [str(article_id) for article_id in article_ids]
+        if not ids:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload',
+                [self.channel, ids],
+            )
+        return len(ids)
@@ -8,6 +8,9 @@ from ingest.models import Site, Article, ArticleContent
 from ingest.choices import ArticleStatus
 from ingest.parsers.factroom.types import ParsedArticle
 from ingest.services.interfaces import ArticlePersistInterface
+from ingest.services.article_events import ArticleChangeNotifier
+from ingest.services.corpus_version import CorpusVersion
+from ingest.services.search_vector import SearchVectorService
 from ingest.services.types import ArticlePersistStats
 
 
@@ -20,10 +23,21 @@ class ArticlePersistService(ArticlePersistInterface):
     - Update fields only when new values are provided AND differ
     - Touch `last_seen_at` on each upsert
     - Upsert ArticleContent (create if missing; update only changed fields)
+    - Refresh ArticleContent.search_vector when title or content_text changed
+    - NOTIFY the embedding listener about the same changes (delivered on commit) and bump the corpus version
     '''
 
-    def __init__(self, default_status: ArticleStatus = ArticleStatus.NEW) -> None:
+    def __init__(
+        self,
+        default_status: ArticleStatus = ArticleStatus.NEW,
+        search_vectors: SearchVectorService | None = None,
+        notifier: ArticleChangeNotifier | None = None,
+        corpus_version: CorpusVersion | None = None,
+    ) -> None:
         self.default_status: ArticleStatus = default_status
+        self.search_vectors = search_vectors or SearchVectorService()
+        self.notifier = notifier or ArticleChangeNotifier()
+        self.corpus_version = corpus_version or CorpusVersion()
 
     @transaction.atomic
     def save_one(self, site: Site, parsed: ParsedArticle) -> tuple[Article, bool]:
@@ -66,6 +80,7 @@ class ArticlePersistService(ArticlePersistInterface):
             if fields_to_update:
                 article.save(update_fields=fields_to_update)
 
+        title_updated = 'title' in fields_to_update
         content_created = False
         content_updated = False
 
@@ -93,6 +108,11 @@ class ArticlePersistService(ArticlePersistInterface):
                     content.save(update_fields=c_fields)
                     content_updated = True
 
+        if content_created or content_updated or title_updated:
+            self.search_vectors.update_articles([article.id])
+            self.notifier.notify([article.id])
+            self.corpus_version.bump()
+
         article._content_created = content_created
         article._content_updated = content_updated
 
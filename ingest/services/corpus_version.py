@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from django.db import connection, transaction
+
+
+class CorpusVersion:
+    '''
+    Monotonic counter of searchable corpus changes, backed by a Postgres sequence:
+
+    - Bumped after commit by every path that changes article text or embeddings
+    - Sequences are non-transactional and never block, so concurrent writers don't
+      serialise on a counter row
+    - Read by the search result cache, whose keys include the current version
+    '''
+    SEQUENCE = 'ingest_corpus_version'
+
+    def current(self) -> int:
+        with connection.cursor() as cursor:
+            # a fresh sequence reports last_value 1 before its first nextval too
+            cursor.execute(f'SELECT CASE WHEN is_called THEN last_value ELSE 0 END FROM {self.SEQUENCE}')
+            return cursor.fetchone()[0]
+
+    def bump(self) -> None:
+        # after commit, so a search can't cache pre-commit rows under the new version
+        transaction.on_commit(self._bump)
+
+    def _bump(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT nextval(%s)', [self.SEQUENCE])
@@ -5,6 +5,9 @@ from django.utils import timezone
 from ingest.models import Site, Article
 from ingest.choices import ArticleStatus
 from ingest.parsers.factroom.interfaces import FeedCard
+from ingest.services.article_events import ArticleChangeNotifier
+from ingest.services.corpus_version import CorpusVersion
+from ingest.services.search_vector import SearchVectorService
 from ingest.services.types import FeedPersistStats
 
 
@@ -15,10 +18,21 @@ class FeedCardPersistService:
       - Create missing Article with minimal fields
       - Update existing fields only if new values are provided and different
       - Touch last_seen_at on every upsert
+      - Refresh ArticleContent.search_vector when the title changed
+      - NOTIFY the embedding listener about the same change (delivered on commit) and bump the corpus version
     '''
 
-    def __init__(self, default_status: ArticleStatus = ArticleStatus.NEW):
+    def __init__(
+        self,
+        default_status: ArticleStatus = ArticleStatus.NEW,
+        search_vectors: SearchVectorService | None = None,
+        notifier: ArticleChangeNotifier | None = None,
+        corpus_version: CorpusVersion | None = None,
+    ):
         self.default_status: ArticleStatus = default_status
+        self.search_vectors = search_vectors or SearchVectorService()
+        self.notifier = notifier or ArticleChangeNotifier()
+        self.corpus_version = corpus_version or CorpusVersion()
 
     @transaction.atomic
     def save_one(self, site: Site, card: FeedCard) -> tuple[Article, bool]:
@@ -56,6 +70,11 @@ class FeedCardPersistService:
             if fields_to_update:
                 article.save(update_fields=fields_to_update)
 
+            if 'title' in fields_to_update:
+                self.search_vectors.update_articles([article.id])
+                self.notifier.notify([article.id])
+                self.corpus_version.bump()
+
         return article, created
 
     @transaction.atomic
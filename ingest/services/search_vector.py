@@ -0,0 +1,58 @@
+from __future__ import annotations
+from typing import Iterable
+
+from django.db import connection
+
+from ingest.models import ArticleContent
+
+
+class SearchVectorService:
+    '''
+    Maintain ArticleContent.search_vector:
+
+    - Article title with weight A, content_text with weight B
+    - Built in SQL, so Python never tokenises the text
+    - Used by the persist services on insert/update and by the backfill command
+    '''
+    UPDATE_SQL = '''
+        UPDATE ingest_articlecontent AS c
+        SET search_vector =
+            setweight(to_tsvector(%(config)s::regconfig, coalesce(a.title, '')), 'A')
+            || setweight(to_tsvector(%(config)s::regconfig, coalesce(c.content_text, '')), 'B')
+        FROM ingest_article AS a
+        WHERE a.id = c.article_id AND {where}
+    '''
+
+    def __init__(self, config: str = 'russian') -> None:
+        self.config = config
+
+    def update_articles(self, article_ids: Iterable[int]) -> int:
+        ids = list(article_ids)
+        if not ids:
+            return 0
+        return self._execute('c.article_id = ANY(%(ids)s)', {'ids': ids})
+
+    def update_range(self, id_from: int, id_to: int, only_missing: bool = False) -> int:
+        where = 'c.id >= %(id_from)s AND c.id < %(id_to)s'
+        if only_missing:
+            where += ' AND c.search_vector IS NULL'
+        return self._execute(where, {'id_from': id_from, 'id_to': id_to})
+
+    def backfill(self, batch_size: int = 1000, only_missing: bool = False) -> int:
+        '''
+        Walk ArticleContent by primary key ranges; each batch is a separate statement.
+        '''
+        ids = ArticleContent.objects.order_by('id').values_list('id', flat=True)
+        last_id = ids.last()
+        if last_id is None:
+            return 0
+
+        updated = 0
+        for id_from in range(ids.first(), last_id + 1, batch_size):
+            updated += self.update_range(id_from, id_from + batch_size, only_missing=only_missing)
+        return updated
+
+    def _execute(self, where: str, params: dict) -> int:
+        with connection.cursor() as cursor:
+            cursor.execute(self.UPDATE_SQL.format(where=where), {'config': self.config, **params})
+            return cursor.rowcount
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import IngestArticleEmbedding
+from .models import ArticleNeighbor, EmbeddingProjection, IngestArticleEmbedding, VectorIndexBuild
 
 
 @admin.register(IngestArticleEmbedding)
@@ -8,3 +8,29 @@ class IngestArticleEmbeddingAdmin(admin.ModelAdmin):
         'article', 'MODEL',
     )
     readonly_fields = ('article',)
+
+
+@admin.register(VectorIndexBuild)
+class VectorIndexBuildAdmin(admin.ModelAdmin):
+    list_display = (
+        'name', 'method', 'row_count', 'recall_before', 'recall_after', 'built_at',
+    )
+    readonly_fields = ('name', 'method', 'params', 'row_count', 'recall_before', 'recall_after', 'built_at')
+
+
+@admin.register(EmbeddingProjection)
+class EmbeddingProjectionAdmin(admin.ModelAdmin):
+    list_display = (
+        'version', 'method', 'dimensions', 'explained_variance', 'fitted_rows', 'is_active', 'created_at',
+    )
+    exclude = ('mean', 'components')
+    readonly_fields = ('version', 'method', 'dimensions', 'source_dimensions', 'explained_variance', 'fitted_rows', 'created_at')
+
+
+@admin.register(ArticleNeighbor)
+class ArticleNeighborAdmin(admin.ModelAdmin):
+    list_display = (
+        'article', 'neighbor', 'score', 'updated_at',
+    )
+    raw_id_fields = ('article', 'neighbor')
+    readonly_fields = ('article', 'neighbor', 'score', 'updated_at')
@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class SemanticConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'semantic'
+
+    def ready(self):
+        # opt-in per process (web, embedding worker); everyone else never loads the model
+        if settings.SEMANTIC_PRELOAD_SHARED:
+            # runs in the Celery / gunicorn --preload parent, before children fork
+            from .prefork import preload_shared_model
+            preload_shared_model()
+        elif settings.SEMANTIC_PRELOAD_MODELS:
+            from .providers import E5Provider
+            E5Provider().warmup()
@@ -0,0 +1,150 @@
+from __future__ import annotations
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .cache import normalize_query
+from .filters import ArticleFilter, SearchFilters
+from .indexes import SearchProfile
+from .search import Retrieval, Scoring, SearchHit, SearchService
+
+
+T = TypeVar('T')
+
+
+class InferenceOverloaded(Exception):
+    """
+    More query encodings in flight than SEMANTIC_ASYNC_MAX_PENDING; the caller should back off.
+    """
+
+
+class InferenceGate:
+    """
+    Bounded offload of query encoding for async callers.
+
+    Encodings run on a small dedicated pool (never on the event loop or the default
+    executor the DB calls use), or on the query batcher's thread when batching is on.
+    At most `max_pending` may be queued or running; past that callers are rejected
+    straight away instead of piling up behind the model.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 64) -> None:
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='semantic-inference')
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    @classmethod
+    def from_settings(cls) -> InferenceGate:
+        return cls(
+            workers=settings.SEMANTIC_ASYNC_INFERENCE_WORKERS,
+            max_pending=settings.SEMANTIC_ASYNC_MAX_PENDING,
+        )
+
+    def _acquire(self) -> None:
+        if not self._slots.acquire(blocking=False):
+            raise InferenceOverloaded(f'{self.max_pending} query encodings already pending')
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        self._acquire()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self._slots.release()
+
+    async def wait(self, submit: Callable[[], Future[T]]) -> T:
+        """
+        Await work that already runs on its own thread (the query batcher), holding a slot
+        but no pool worker, so concurrent requests still coalesce into one forward pass.
+        """
+        self._acquire()
+        try:
+            return await asyncio.wrap_future(submit())
+        finally:
+            self._slots.release()
+
+
+_inference_gate: Optional[InferenceGate] = None
+_inference_gate_lock = threading.Lock()
+
+
+def get_inference_gate() -> InferenceGate:
+    global _inference_gate
+    if _inference_gate is None:
+        with _inference_gate_lock:
+            if _inference_gate is None:
+                _inference_gate = InferenceGate.from_settings()
+    return _inference_gate
+
+
+class AsyncSearchService:
+    """
+    Async front for SearchService with the same results and caches.
+
+    Query encoding goes through the InferenceGate; the cache lookups and SQL run in
+    sync_to_async threads, so one event loop can hold many searches while only the
+    gate's workers hold the model.
+    """
+
+    def __init__(self, service: Optional[SearchService] = None, gate: Optional[InferenceGate] = None) -> None:
+        self.service = service or SearchService()
+        self.gate = gate or get_inference_gate()
+
+    async def embed_query(self, query: str) -> list[float]:
+        query = normalize_query(query)
+        provider = self.service.embedding_provider
+        encoder = provider.cache_name
+        query_cache = self.service.query_cache
+
+        vector = await sync_to_async(query_cache.get, thread_sensitive=False)(encoder, query)
+        if vector is None:
+            if settings.SEMANTIC_QUERY_BATCHING:
+                # the first access loads the model; keep that off the event loop
+                batcher = await sync_to_async(lambda: provider.query_batcher, thread_sensitive=False)()
+                vector = await self.gate.wait(lambda: batcher.submit(query))
+            else:
+                vector = await self.gate.run(provider.embed_query, query)
+            await sync_to_async(query_cache.set, thread_sensitive=False)(encoder, query, vector)
+        return vector
+
+    async def search(
+        self,
+        query: str,
+        limit: int = 10,
+        retrieval: Optional[Retrieval] = None,
+        scoring: Optional[Scoring] = None,
+        profile: Optional[SearchProfile] = None,
+        filters: Optional[SearchFilters] = None,
+    ) -> list[SearchHit]:
+        if not query.strip():
+            return []
+
+        service = self.service
+        limit, retrieval, scoring, profile = service.resolve_options(limit, retrieval, scoring, profile)
+        article_filter = ArticleFilter(filters)
+        result_cache = service.result_cache
+
+        key = None
+        if result_cache.enabled:
+            params = service.cache_params(limit, retrieval, scoring, profile, article_filter)
+            key, results = await sync_to_async(result_cache.lookup)(query, params)
+            if results is not None:
+                return results
+
+        query_vector = await self.embed_query(query)
+        if scoring == 'rrf':
+            results = await sync_to_async(service.search_rrf)(
+                query, limit=limit, profile=profile, query_vector=query_vector, article_filter=article_filter,
+            )
+        else:
+            results = await sync_to_async(service.search_linear)(
+                query, limit=limit, retrieval=retrieval, profile=profile, query_vector=query_vector,
+                article_filter=article_filter,
+            )
+
+        if key is not None:
+            await sync_to_async(result_cache.store, thread_sensitive=False)(key, results)
+        return results
@@ -0,0 +1,109 @@
+from __future__ import annotations
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from .types import BatcherStats
+
+
+EncodeBatch = Callable[[list[str]], list[list[float]]]
+
+
+class QueryBatcher:
+    """
+    In-process micro-batching in front of query encoding.
+
+    Callers enqueue a text and block on a Future; one worker thread drains the queue
+    and runs a single forward pass per batch. A lone request is encoded right away;
+    the worker only waits up to `max_wait_ms` for stragglers once a batch has formed,
+    so idle latency stays the same and requests that arrive while the model is busy
+    are grouped for the next pass.
+    """
+
+    def __init__(self, encode_batch: EncodeBatch, max_batch_size: int = 32, max_wait_ms: float = 5) -> None:
+        self.encode_batch = encode_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self._queue: queue.Queue[tuple[str, Future[list[float]]]] = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self.batches = 0
+        self.items = 0
+        self.max_seen_batch = 0
+        self.last_batch_size = 0
+
+    def submit(self, text: str) -> Future[list[float]]:
+        self._ensure_worker()
+        future: Future[list[float]] = Future()
+        self._queue.put((text, future))
+        return future
+
+    def embed(self, text: str) -> list[float]:
+        return self.submit(text).result()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='semantic-query-batcher', daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> list[tuple[str, Future[list[float]]]]:
+        batch = [self._queue.get()]
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        if len(batch) > 1:
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            # drop callers that cancelled while queued
+            live = [(text, future) for text, future in self._collect() if future.set_running_or_notify_cancel()]
+            if not live:
+                continue
+            texts = [text for text, _ in live]
+            futures = [future for _, future in live]
+
+            try:
+                vectors = self.encode_batch(texts)
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+            else:
+                for future, vector in zip(futures, vectors):
+                    future.set_result(vector)
+
+            with self._lock:
+                self.batches += 1
+                self.items += len(texts)
+                self.last_batch_size = len(texts)
+                self.max_seen_batch = max(self.max_seen_batch, len(texts))
+
+    def stats(self) -> BatcherStats:
+        with self._lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'batches': self.batches,
+                'items': self.items,
+                'avg_batch_size': round(self.items / self.batches, 2) if self.batches else 0.0,
+                'max_batch_size': self.max_seen_batch,
+                'last_batch_size': self.last_batch_size,
+            }
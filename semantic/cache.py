@@ -0,0 +1,201 @@
+from __future__ import annotations
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Optional, Sequence, TypeVar
+
+from django.conf import settings
+from django.core.cache import caches, BaseCache
+
+from ingest.services.corpus_version import CorpusVersion
+from .types import QueryCacheStats, SearchResultCacheStats
+
+
+V = TypeVar('V')
+
+
+def normalize_query(text: str) -> str:
+    return ' '.join((text or '').split())
+
+
+class BoundedCache(Generic[V]):
+    """
+    Thread-safe LRU/TTL dict with hit/miss counters. When `backend` names a Django CACHES
+    alias, in-process misses fall through to it so workers share the hottest entries.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: int = 3600, backend: Optional[str] = None) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.backend: Optional[BaseCache] = caches[backend] if backend else None
+
+        self._data: OrderedDict[str, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def _get(self, key: str) -> Optional[V]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+
+        if self.backend is not None:
+            value = self.backend.get(key)
+            if value is not None:
+                self._store(key, value, now)
+                with self._lock:
+                    self.shared_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _set(self, key: str, value: V) -> None:
+        self._store(key, value, time.monotonic())
+        if self.backend is not None:
+            self.backend.set(key, value, timeout=self.ttl)
+
+    def _store(self, key: str, value: V, now: float) -> None:
+        with self._lock:
+            self._data[key] = (now + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.shared_hits = self.misses = 0
+
+    def stats(self) -> QueryCacheStats:
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                'size': len(self._data),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+
+class QueryEmbeddingCache(BoundedCache[list[float]]):
+    """
+    Query vectors keyed by (model name, normalised query).
+    """
+
+    @classmethod
+    def from_settings(cls) -> QueryEmbeddingCache:
+        return cls(
+            max_size=settings.SEMANTIC_QUERY_CACHE_SIZE,
+            ttl=settings.SEMANTIC_QUERY_CACHE_TTL,
+            backend=settings.SEMANTIC_QUERY_CACHE_BACKEND or None,
+        )
+
+    @staticmethod
+    def make_key(encoder: str, query: str) -> str:
+        # encoder: model and backend (E5Provider.cache_name), whose vectors differ slightly
+        digest = hashlib.sha1(f'{encoder}\n{query}'.encode()).hexdigest()
+        return f'semantic:query-embedding:{digest}'
+
+    def get(self, encoder: str, query: str) -> Optional[list[float]]:
+        if not self.enabled:
+            return None
+        return self._get(self.make_key(encoder, query))
+
+    def set(self, encoder: str, query: str, vector: list[float]) -> None:
+        if not self.enabled:
+            return
+        self._set(self.make_key(encoder, query), vector)
+
+
+class SearchResultCache(BoundedCache[list]):
+    """
+    Finished search results keyed by corpus version + normalised query + every parameter
+    that changes the ranking. A corpus version bump makes all older keys unreachable,
+    so invalidation is O(1) and the stale entries simply age out of the LRU.
+    """
+
+    def __init__(self, *args, corpus_version: Optional[CorpusVersion] = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.corpus_version = corpus_version or CorpusVersion()
+
+    @classmethod
+    def from_settings(cls) -> SearchResultCache:
+        return cls(
+            max_size=settings.SEMANTIC_RESULT_CACHE_SIZE,
+            ttl=settings.SEMANTIC_RESULT_CACHE_TTL,
+            backend=settings.SEMANTIC_RESULT_CACHE_BACKEND or None,
+        )
+
+    @staticmethod
+    def make_key(version: int, query: str, params: Sequence) -> str:
+        raw = '\n'.join([str(version), query, *map(str, params)])
+        return f'semantic:search-result:{hashlib.sha1(raw.encode()).hexdigest()}'
+
+    def lookup(self, query: str, params: Sequence) -> tuple[str, Optional[list]]:
+        """
+        (key, cached results or None); the key pins the corpus version read here,
+        so results computed after a concurrent bump are stored under the old version.
+        """
+        key = self.make_key(self.corpus_version.current(), normalize_query(query), params)
+        return key, self._get(key)
+
+    def store(self, key: str, results: list) -> None:
+        self._set(key, results)
+
+    def get_or_compute(self, query: str, params: Sequence, compute: Callable[[], list]) -> list:
+        if not self.enabled:
+            return compute()
+        key, results = self.lookup(query, params)
+        if results is None:
+            results = compute()
+            self.store(key, results)
+        return results
+
+    def stats(self) -> SearchResultCacheStats:
+        return {**super().stats(), 'corpus_version': self.corpus_version.current()}
+
+
+_query_embedding_cache: Optional[QueryEmbeddingCache] = None
+_query_embedding_cache_lock = threading.Lock()
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    """
+    Process-wide cache instance; SearchService is created per request.
+    """
+    global _query_embedding_cache
+    if _query_embedding_cache is None:
+        with _query_embedding_cache_lock:
+            if _query_embedding_cache is None:
+                _query_embedding_cache = QueryEmbeddingCache.from_settings()
+    return _query_embedding_cache
+
+
+_search_result_cache: Optional[SearchResultCache] = None
+_search_result_cache_lock = threading.Lock()
+
+
+def get_search_result_cache() -> SearchResultCache:
+    global _search_result_cache
+    if _search_result_cache is None:
+        with _search_result_cache_lock:
+            if _search_result_cache is None:
+                _search_result_cache = SearchResultCache.from_settings()
+    return _search_result_cache
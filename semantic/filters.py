@@ -0,0 +1,172 @@
+from __future__ import annotations
+import json
+import logging
+from datetime import datetime
+from typing import Literal, Optional, TypedDict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+
+from ingest.models import Article, Category
+from .models import IngestArticleEmbedding
+
+
+logger = logging.getLogger(__name__)
+
+# 'exact': distances over the materialised filtered subset; 'iterative': ANN index scan that keeps
+# going until enough rows pass the filter (pgvector >= 0.8 iterative_scan)
+FilterStrategy = Literal['exact', 'iterative']
+
+TABLE = IngestArticleEmbedding._meta.db_table
+ARTICLES = Article._meta.db_table
+
+
+class SearchFilters(TypedDict, total=False):
+    site_id: int
+    # the category and all of its descendants
+    category_id: int
+    published_from: datetime
+    # exclusive
+    published_to: datetime
+
+
+class ArticleFilter:
+    """
+    Search filters on ingest.Article, rendered for the ORM (text retrieval, blending)
+    and for raw SQL on `a` (vector retrieval).
+    """
+
+    def __init__(self, filters: Optional[SearchFilters] = None) -> None:
+        self.filters: SearchFilters = {key: value for key, value in (filters or {}).items() if value is not None}
+        self._category_ids: Optional[list[int]] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.filters)
+
+    @property
+    def category_ids(self) -> list[int]:
+        if self._category_ids is None:
+            self._category_ids = category_subtree(self.filters['category_id'])
+        return self._category_ids
+
+    def q(self, prefix: str = 'article__') -> Q:
+        q = Q()
+        if 'site_id' in self.filters:
+            q &= Q(**{f'{prefix}site_id': self.filters['site_id']})
+        if 'category_id' in self.filters:
+            q &= Q(**{f'{prefix}category_id__in': self.category_ids})
+        if 'published_from' in self.filters:
+            q &= Q(**{f'{prefix}published_at__gte': self.filters['published_from']})
+        if 'published_to' in self.filters:
+            q &= Q(**{f'{prefix}published_at__lt': self.filters['published_to']})
+        return q
+
+    def sql(self, alias: str = 'a') -> tuple[str, list]:
+        clauses, params = ['TRUE'], []
+        if 'site_id' in self.filters:
+            clauses.append(f'{alias}.site_id = %s')
+            params.append(self.filters['site_id'])
+        if 'category_id' in self.filters:
+            clauses.append(f'{alias}.category_id = ANY(%s)')
+            params.append(self.category_ids)
+        if 'published_from' in self.filters:
+            clauses.append(f'{alias}.published_at >= %s')
+            params.append(self.filters['published_from'])
+        if 'published_to' in self.filters:
+            clauses.append(f'{alias}.published_at < %s')
+            params.append(self.filters['published_to'])
+        return ' AND '.join(clauses), params
+
+    def cache_key(self) -> tuple:
+        return tuple(sorted((key, str(value)) for key, value in self.filters.items()))
+
+
+def category_subtree(category_id: int) -> list[int]:
+    table = Category._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'''
+            WITH RECURSIVE subtree AS (
+                SELECT id FROM {table} WHERE id = %s
+                UNION
+                SELECT c.id FROM {table} AS c JOIN subtree AS s ON c.parent_id = s.id
+            )
+            SELECT id FROM subtree
+            ''',
+            [category_id],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def estimate_rows(article_filter: ArticleFilter) -> int:
+    """
+    Planner estimate of embedded articles matching the filter; an EXPLAIN, not a COUNT,
+    so the estimate costs the same whatever the subset size.
+    """
+    where, params = article_filter.sql()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'EXPLAIN (FORMAT JSON) SELECT 1 FROM {TABLE} AS e JOIN {ARTICLES} AS a ON a.id = e.article_id WHERE {where}',
+            params,
+        )
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def choose_strategy(article_filter: ArticleFilter) -> FilterStrategy:
+    """
+    A small subset is cheapest to scan exactly (cost ~ matching rows); a large one is
+    better served by the ANN index walking on until `k` rows pass (cost ~ k / selectivity).
+    """
+    rows = estimate_rows(article_filter)
+    strategy: FilterStrategy = 'exact' if rows <= settings.SEMANTIC_FILTER_EXACT_MAX_ROWS else 'iterative'
+    logger.debug('Filtered vector search: filters=%s estimated_rows=%s strategy=%s', article_filter.filters, rows, strategy)
+    return strategy
+
+
+def filtered_nearest_ids(
+    query_vector: list[float],
+    k: int,
+    article_filter: ArticleFilter,
+    strategy: Optional[FilterStrategy] = None,
+) -> list[int]:
+    """
+    Top-k embedding ids by cosine distance among articles matching the filter. Unlike
+    filtering after an ANN LIMIT, both strategies return k rows whenever k rows match.
+    """
+    strategy = strategy or choose_strategy(article_filter)
+    where, filter_params = article_filter.sql()
+
+    if strategy == 'exact':
+        sql = f'''
+            WITH filtered AS MATERIALIZED (
+                SELECT e.id, e.vector FROM {TABLE} AS e
+                JOIN {ARTICLES} AS a ON a.id = e.article_id
+                WHERE {where}
+            )
+            SELECT id FROM filtered ORDER BY vector <=> %s::vector LIMIT %s
+        '''
+        params = [*filter_params, query_vector, k]
+    else:
+        # relaxed_order may return rows slightly out of order, so re-sort the materialised top-k
+        sql = f'''
+            WITH nearest AS MATERIALIZED (
+                SELECT e.id, e.vector <=> %s::vector AS distance FROM {TABLE} AS e
+                JOIN {ARTICLES} AS a ON a.id = e.article_id
+                WHERE {where}
+                ORDER BY distance
+                LIMIT %s
+            )
+            SELECT id FROM nearest ORDER BY distance
+        '''
+        params = [query_vector, *filter_params, k]
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if strategy == 'iterative':
+            method = settings.SEMANTIC_VECTOR_INDEX['method']
+            cursor.execute('SELECT set_config(%s, %s, true)', [f'{method}.iterative_scan', 'relaxed_order'])
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
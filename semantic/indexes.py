@@ -0,0 +1,302 @@
+from __future__ import annotations
+import logging
+import math
+from contextlib import contextmanager
+from typing import Iterator, Literal, Optional, TypedDict
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import IngestArticleEmbedding, VectorIndexBuild
+from .projection import ProjectionService, get_active_projection
+
+
+logger = logging.getLogger(__name__)
+
+IndexMethod = Literal['hnsw', 'ivfflat']
+# what the ANN index is built over: the float vector, its half-precision cast, its binary quantisation
+# or its PCA projection (vector_reduced)
+IndexKind = Literal['vector', 'halfvec', 'bit', 'pca']
+INDEX_KINDS: tuple[IndexKind, ...] = ('vector', 'halfvec', 'bit', 'pca')
+SearchProfile = Literal['fast', 'balanced', 'exact']
+SEARCH_PROFILES: tuple[SearchProfile, ...] = ('fast', 'balanced', 'exact')
+
+
+class VectorIndexParams(TypedDict, total=False):
+    kind: IndexKind
+    method: IndexMethod
+    # hnsw
+    m: int
+    ef_construction: int
+    # ivfflat
+    lists: int
+
+
+class VectorIndexInfo(TypedDict):
+    name: str
+    kind: IndexKind
+    definition: str
+
+
+class VectorIndexMaintenanceResult(TypedDict):
+    rebuilt: bool
+    row_count: int
+    built_row_count: Optional[int]
+    drift: Optional[float]
+    recall_before: Optional[float]
+    recall_after: Optional[float]
+
+
+TABLE = IngestArticleEmbedding._meta.db_table
+DIMENSIONS: int = IngestArticleEmbedding._meta.get_field('vector').dimensions
+
+# indexed expression, opclass and distance operator per index kind;
+# compact kinds are expression indexes, so there is no extra column to keep in sync
+INDEX_EXPRESSIONS: dict[IndexKind, tuple[str, str, str]] = {
+    'vector': ('vector', 'vector_cosine_ops', '<=>'),
+    'halfvec': (f'(vector::halfvec({DIMENSIONS}))', 'halfvec_cosine_ops', '<=>'),
+    'bit': (f'(binary_quantize(vector)::bit({DIMENSIONS}))', 'bit_hamming_ops', '<~>'),
+    'pca': ('vector_reduced', 'vector_cosine_ops', '<=>'),
+}
+QUERY_EXPRESSIONS: dict[IndexKind, str] = {
+    'vector': '%s::vector',
+    'halfvec': f'%s::vector::halfvec({DIMENSIONS})',
+    'bit': f'binary_quantize(%s::vector)::bit({DIMENSIONS})',
+    'pca': '%s::vector',
+}
+
+
+def index_kind(definition: str) -> IndexKind:
+    if 'vector_reduced' in definition:
+        return 'pca'
+    if 'binary_quantize' in definition:
+        return 'bit'
+    if 'halfvec' in definition:
+        return 'halfvec'
+    return 'vector'
+
+
+def nearest_ids(
+    query_vector: list[float],
+    k: int,
+    kind: IndexKind = 'vector',
+    rerank_factor: int = 4,
+    candidate_vector: Optional[list[float]] = None,
+) -> list[int]:
+    """
+    Top-k embedding ids by cosine distance. Compact kinds take k * rerank_factor candidates
+    from their own index and re-rank only those with the stored float vectors.
+    'pca' ranks candidates by `candidate_vector`, the query under the active projection;
+    with no projection rolled out (or a refit in progress) it falls back to the float index.
+    """
+    if kind == 'pca' and candidate_vector is None:
+        projection = get_active_projection()
+        if projection is None:
+            kind = 'vector'
+        else:
+            candidate_vector = ProjectionService.transform_one(projection, query_vector)
+
+    expression, _, operator = INDEX_EXPRESSIONS[kind]
+    if kind == 'vector':
+        sql = f'SELECT id FROM {TABLE} ORDER BY vector <=> %s::vector LIMIT %s'
+        params = [query_vector, k]
+    else:
+        sql = f'''
+            SELECT id FROM (
+                SELECT id, vector FROM {TABLE}
+                ORDER BY {expression} {operator} {QUERY_EXPRESSIONS[kind]}
+                LIMIT %s
+            ) AS candidates
+            ORDER BY vector <=> %s::vector
+            LIMIT %s
+        '''
+        params = [candidate_vector if kind == 'pca' else query_vector, k * rerank_factor, query_vector, k]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+class VectorIndexManager:
+    """
+    Owns the ANN indexes on IngestArticleEmbedding.vector, one per kind
+    (float vector, halfvec cast, binary quantisation).
+
+    Rebuilds build the new index CONCURRENTLY next to the old one, then swap names,
+    so search keeps an index the whole time. Must run outside a transaction.
+    """
+    table = TABLE
+
+    def __init__(self, params: Optional[VectorIndexParams] = None) -> None:
+        self.params: VectorIndexParams = {'kind': 'vector', **settings.SEMANTIC_VECTOR_INDEX, **(params or {})}
+
+    @property
+    def kind(self) -> IndexKind:
+        return self.params['kind']
+
+    @property
+    def method(self) -> IndexMethod:
+        return self.params['method']
+
+    def index_name(self, method: Optional[IndexMethod] = None) -> str:
+        return f'ingestarticleembedding_{self.kind}_{method or self.method}'
+
+    def with_clause(self) -> str:
+        if self.method == 'hnsw':
+            return f'm = {int(self.params['m'])}, ef_construction = {int(self.params['ef_construction'])}'
+        return f'lists = {int(self.params['lists'])}'
+
+    def existing_indexes(self) -> list[VectorIndexInfo]:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                '''
+                SELECT indexname, indexdef FROM pg_indexes
+                WHERE tablename = %s AND (indexdef ILIKE '%%USING hnsw%%' OR indexdef ILIKE '%%USING ivfflat%%')
+                ''',
+                [self.table],
+            )
+            return [
+                {'name': name, 'kind': index_kind(definition), 'definition': definition}
+                for name, definition in cursor.fetchall()
+            ]
+
+    def index_size(self, name: Optional[str] = None) -> Optional[int]:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_relation_size(to_regclass(%s))', [name or self.index_name()])
+            return cursor.fetchone()[0]
+
+    def build_sql(self, name: str) -> str:
+        expression, opclass, _ = INDEX_EXPRESSIONS[self.kind]
+        return (
+            f'CREATE INDEX CONCURRENTLY {connection.ops.quote_name(name)} '
+            f'ON {connection.ops.quote_name(self.table)} '
+            f'USING {self.method} ({expression} {opclass}) '
+            f'WITH ({self.with_clause()})'
+        )
+
+    def row_count(self) -> int:
+        return IngestArticleEmbedding.objects.count()
+
+    def rebuild(self, recall_before: Optional[float] = None, recall_sample: int = 0) -> VectorIndexBuild:
+        if connection.in_atomic_block:
+            raise RuntimeError('Vector index rebuild must run outside a transaction')
+
+        name = self.index_name()
+        tmp_name = f'{name}_new'
+        quote = connection.ops.quote_name
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {quote(tmp_name)}')
+            cursor.execute(self.build_sql(tmp_name))
+            for index in self.existing_indexes():
+                if index['name'] != tmp_name and index['kind'] == self.kind:
+                    cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {quote(index['name'])}')
+            cursor.execute(f'ALTER INDEX {quote(tmp_name)} RENAME TO {quote(name)}')
+            cursor.execute(f'ANALYZE {quote(self.table)}')
+
+        return VectorIndexBuild.objects.create(
+            name=name,
+            method=self.method,
+            params=dict(self.params),
+            row_count=self.row_count(),
+            recall_before=recall_before,
+            recall_after=self.measure_recall(sample=recall_sample) if recall_sample else None,
+        )
+
+    def measure_recall(self, sample: int = 50, k: int = 10, profile: Optional[SearchProfile] = None) -> Optional[float]:
+        """
+        Mean recall@k of the ANN index against an exact scan, using stored vectors as queries.
+        """
+        queries = list(
+            IngestArticleEmbedding.objects.order_by('?').values_list('vector', flat=True)[:sample]
+        )
+        if not queries:
+            return None
+
+        recalls: list[float] = []
+        for vector in queries:
+            query_vector = [float(x) for x in vector]
+            with search_profile(profile or settings.SEMANTIC_SEARCH_PROFILE):
+                approx = set(nearest_ids(query_vector, k, kind=self.kind, rerank_factor=settings.SEMANTIC_SEARCH_RERANK_FACTOR))
+            with search_profile('exact'):
+                exact = set(nearest_ids(query_vector, k))
+            recalls.append(len(approx & exact) / len(exact) if exact else 1.0)
+        return round(sum(recalls) / len(recalls), 4)
+
+
+class VectorIndexMaintenance:
+    """
+    Re-cluster ivfflat as the corpus grows: an ivfflat built on a nearly empty table keeps
+    its bad centroids forever, so rebuild once the row count drifts far enough from the
+    count recorded at build time, with `lists` derived from the current size.
+    """
+
+    def __init__(self, drift_threshold: Optional[float] = None, recall_sample: Optional[int] = None) -> None:
+        self.drift_threshold = drift_threshold or settings.SEMANTIC_VECTOR_INDEX_REBUILD_DRIFT
+        self.recall_sample = settings.SEMANTIC_VECTOR_INDEX_RECALL_SAMPLE if recall_sample is None else recall_sample
+
+    @staticmethod
+    def lists_for_rows(rows: int) -> int:
+        # pgvector guidance: rows / 1000 up to 1M rows, sqrt(rows) above
+        if rows <= 1_000_000:
+            return max(10, rows // 1000)
+        return int(math.sqrt(rows))
+
+    @staticmethod
+    def drift(rows: int, built_rows: int) -> float:
+        return max(rows, 1) / max(built_rows, 1)
+
+    def run(self, force: bool = False) -> VectorIndexMaintenanceResult:
+        manager = VectorIndexManager()
+        rows = manager.row_count()
+        last_build = VectorIndexBuild.objects.filter(name=manager.index_name('ivfflat')).order_by('-built_at').first()
+
+        built_rows = last_build.row_count if last_build else None
+        drift = self.drift(rows, built_rows) if built_rows is not None else None
+        result: VectorIndexMaintenanceResult = {
+            'rebuilt': False,
+            'row_count': rows,
+            'built_row_count': built_rows,
+            'drift': drift,
+            'recall_before': None,
+            'recall_after': None,
+        }
+
+        if manager.method != 'ivfflat' or not rows:
+            return result
+        # no build recorded means the migration-time index on an empty table
+        if not force and drift is not None and 1 / self.drift_threshold < drift < self.drift_threshold:
+            return result
+
+        recall_before = manager.measure_recall(sample=self.recall_sample) if self.recall_sample else None
+        manager = VectorIndexManager(params={'method': 'ivfflat', 'lists': self.lists_for_rows(rows)})
+        build = manager.rebuild(recall_before=recall_before, recall_sample=self.recall_sample)
+
+        result.update(rebuilt=True, recall_before=build.recall_before, recall_after=build.recall_after)
+        logger.info(
+            'ivfflat rebuilt: rows=%s built_rows=%s lists=%s recall_before=%s recall_after=%s',
+            rows, built_rows, manager.params['lists'], build.recall_before, build.recall_after,
+        )
+        return result
+
+
+def profile_settings(profile: SearchProfile) -> dict[str, str]:
+    """
+    Session GUCs for a recall/latency profile. 'exact' turns off plain index scans,
+    so the ORDER BY distance runs as an exact scan instead of an ANN lookup.
+    """
+    values = settings.SEMANTIC_SEARCH_PROFILES[profile]
+    return {name: str(value) for name, value in values.items()}
+
+
+@contextmanager
+def search_profile(profile: Optional[SearchProfile]) -> Iterator[None]:
+    """
+    Transaction with the profile GUCs set LOCAL, so they never leak to the pooled connection.
+    """
+    with transaction.atomic():
+        if profile:
+            with connection.cursor() as cursor:
+                for name, value in profile_settings(profile).items():
+                    cursor.execute('SELECT set_config(%s, %s, true)', [name, value])
+        yield
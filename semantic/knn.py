@@ -0,0 +1,208 @@
+from __future__ import annotations
+import logging
+import tempfile
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+from numpy.typing import NDArray
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .indexes import search_profile
+from .models import ArticleNeighbor, IngestArticleEmbedding
+from .search import SearchHit
+from .snapshot import ARTICLE_IDS, VECTORS, EmbeddingSnapshotService
+
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(vectors: NDArray[np.float32]) -> NDArray[np.float32]:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / (np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12)
+
+
+class KnnGraphService:
+    """
+    Build, update and read the ArticleNeighbor kNN graph.
+
+    The offline build dumps the vectors to a memory-mapped snapshot and computes exact
+    cosine top-k with blocked matrix products: a (block_size x block_size) score tile at
+    a time, merged into a running (block_size x k) top-k, so neither the N x N matrix nor
+    the whole N x D matrix has to fit in RAM. New embeddings are folded in incrementally
+    with ANN queries, see update_articles.
+    """
+
+    def __init__(self, k: int = 10, block_size: int = 2048) -> None:
+        self.k = k
+        self.block_size = block_size
+
+    @staticmethod
+    def merge_top_k(
+        best_scores: NDArray[np.float32],
+        best_idx: NDArray[np.int64],
+        scores: NDArray[np.float32],
+        offset: int,
+        k: int,
+    ) -> tuple[NDArray[np.float32], NDArray[np.int64]]:
+        """
+        Fold a score tile (rows x cols, columns offset by `offset`) into a running top-k.
+        """
+        columns = np.broadcast_to(np.arange(offset, offset + scores.shape[1], dtype=np.int64), scores.shape)
+        all_scores = np.hstack([best_scores, scores])
+        all_idx = np.hstack([best_idx, columns])
+        top = np.argpartition(-all_scores, k - 1, axis=1)[:, :k]
+        return np.take_along_axis(all_scores, top, axis=1), np.take_along_axis(all_idx, top, axis=1)
+
+    def top_k(self, vectors: NDArray[np.float32]) -> Iterable[tuple[int, NDArray[np.float32], NDArray[np.int64]]]:
+        """
+        Yield (row offset, scores, indexes) per query block; self matches are excluded
+        and each row is sorted by descending score.
+        """
+        rows = vectors.shape[0]
+        k = min(self.k, rows - 1)
+        if k <= 0:
+            return
+        for q_start in range(0, rows, self.block_size):
+            queries = _normalize(vectors[q_start:q_start + self.block_size])
+            best_scores = np.full((queries.shape[0], k), -np.inf, dtype=np.float32)
+            best_idx = np.full((queries.shape[0], k), -1, dtype=np.int64)
+
+            for c_start in range(0, rows, self.block_size):
+                scores = queries @ _normalize(vectors[c_start:c_start + self.block_size]).T
+                if c_start == q_start:
+                    np.fill_diagonal(scores, -np.inf)
+                best_scores, best_idx = self.merge_top_k(best_scores, best_idx, scores, c_start, k)
+
+            order = np.argsort(-best_scores, axis=1)
+            yield q_start, np.take_along_axis(best_scores, order, axis=1), np.take_along_axis(best_idx, order, axis=1)
+
+    def build(self) -> int:
+        """
+        Exact rebuild of the whole graph; each query block replaces its articles' rows
+        in one transaction, so readers see either the old or the new list per article.
+        """
+        with tempfile.TemporaryDirectory(prefix='semantic-knn-') as tmp:
+            path = Path(tmp)
+            EmbeddingSnapshotService().export(path)
+            vectors = np.load(path / VECTORS, mmap_mode='r')
+            article_ids = np.load(path / ARTICLE_IDS, mmap_mode='r')
+
+            written = 0
+            for offset, scores, idx in self.top_k(vectors):
+                block_ids = article_ids[offset:offset + scores.shape[0]]
+                neighbors = [
+                    ArticleNeighbor(article_id=int(article_id), neighbor_id=int(article_ids[j]), score=float(score))
+                    for article_id, row_scores, row_idx in zip(block_ids, scores, idx)
+                    for score, j in zip(row_scores, row_idx)
+                    if j >= 0
+                ]
+                with transaction.atomic():
+                    ArticleNeighbor.objects.filter(article_id__in=block_ids.tolist()).delete()
+                    ArticleNeighbor.objects.bulk_create(neighbors, batch_size=5000)
+                written += len(neighbors)
+                logger.info('kNN graph: %s/%s articles', offset + scores.shape[0], vectors.shape[0])
+        return written
+
+    def nearest(self, article_id: int) -> list[tuple[int, float]]:
+        """
+        ANN top-k (article id, cosine similarity) of an embedded article, excluding itself.
+        """
+        table = IngestArticleEmbedding._meta.db_table
+        source = f'(SELECT vector FROM {table} WHERE article_id = %(article_id)s)'
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'''
+                SELECT article_id, 1 - (vector <=> {source}) FROM {table}
+                WHERE article_id <> %(article_id)s
+                ORDER BY vector <=> {source}
+                LIMIT %(k)s
+                ''',
+                {'article_id': article_id, 'k': self.k},
+            )
+            return [(neighbor_id, float(score)) for neighbor_id, score in cursor.fetchall()]
+
+    def update_articles(self, article_ids: Iterable[int]) -> int:
+        """
+        Incremental update for new/changed embeddings: replace each article's own list from
+        an ANN query, then offer the article to those neighbours whose list it now beats
+        (similarity is symmetric), trimming their lists back to k.
+        """
+        ids = list(article_ids)
+        if not ids:
+            return 0
+
+        now = timezone.now()
+        own: list[ArticleNeighbor] = []
+        reverse: dict[int, list[tuple[int, float]]] = {}
+        with search_profile(settings.SEMANTIC_SEARCH_PROFILE):
+            for article_id in ids:
+                for neighbor_id, score in self.nearest(article_id):
+                    own.append(ArticleNeighbor(article_id=article_id, neighbor_id=neighbor_id, score=score, updated_at=now))
+                    reverse.setdefault(neighbor_id, []).append((article_id, score))
+
+            ArticleNeighbor.objects.filter(article_id__in=ids).delete()
+            # another worker may have offered one of these edges between the delete and this insert
+            ArticleNeighbor.objects.bulk_create(
+                own,
+                update_conflicts=True,
+                unique_fields=['article', 'neighbor'],
+                update_fields=['score', 'updated_at'],
+            )
+
+            # only neighbours already in the graph; an unbuilt graph isn't grown one edge at a time
+            built = set(
+                ArticleNeighbor.objects.filter(article_id__in=reverse.keys()).exclude(article_id__in=ids)
+                .values_list('article_id', flat=True).distinct()
+            )
+            ArticleNeighbor.objects.bulk_create(
+                [
+                    ArticleNeighbor(article_id=neighbor_id, neighbor_id=article_id, score=score, updated_at=now)
+                    for neighbor_id in built
+                    for article_id, score in reverse[neighbor_id]
+                ],
+                update_conflicts=True,
+                unique_fields=['article', 'neighbor'],
+                update_fields=['score', 'updated_at'],
+            )
+            self.trim(built)
+        return len(own)
+
+    def trim(self, article_ids: Iterable[int]) -> int:
+        ids = list(article_ids)
+        if not ids:
+            return 0
+        table = ArticleNeighbor._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'''
+                DELETE FROM {table} WHERE id IN (
+                    SELECT id FROM (
+                        SELECT id, row_number() OVER (PARTITION BY article_id ORDER BY score DESC) AS rank
+                        FROM {table} WHERE article_id = ANY(%s)
+                    ) AS ranked
+                    WHERE rank > %s
+                )
+                ''',
+                [ids, self.k],
+            )
+            return cursor.rowcount
+
+    @staticmethod
+    def neighbors(article_id: int, limit: int = 10) -> list[SearchHit]:
+        rows = (
+            ArticleNeighbor.objects.filter(article_id=article_id)
+            .select_related('neighbor')
+            .order_by('-score')[:limit]
+        )
+        return [
+            {
+                'article_id': row.neighbor.id,
+                'url': row.neighbor.url,
+                'title': row.neighbor.title or row.neighbor.url,
+                'score': row.score,
+            }
+            for row in rows
+        ]
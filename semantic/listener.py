@@ -0,0 +1,138 @@
+from __future__ import annotations
+import logging
+import select
+import time
+from contextlib import suppress
+from typing import Optional
+
+from django.db import DatabaseError, InterfaceError, OperationalError, connection
+
+from ingest.services.article_events import ARTICLE_CHANGED_CHANNEL
+from .services import EmbeddingIngestService
+
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingListener:
+    """
+    Long-running consumer of ARTICLE_CHANGED_CHANNEL notifications.
+
+    Article ids are coalesced into micro-batches: a batch is flushed once it reaches
+    `batch_size` ids or `max_wait` seconds after its first id, then embedded through the
+    claim-based backfill, so it can run next to the hourly sweep and other listeners.
+    A dropped connection is re-established and followed by one catch-up claim of up to
+    `catch_up_limit` articles for notifications missed meanwhile; those sent while the
+    listener is not running at all are left to the sweep.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 32,
+        max_wait: float = 2.0,
+        channel: str = ARTICLE_CHANGED_CHANNEL,
+        catch_up_limit: int = 1000,
+        max_reconnect_delay: float = 30.0,
+    ) -> None:
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.channel = channel
+        self.catch_up_limit = catch_up_limit
+        self.max_reconnect_delay = max_reconnect_delay
+        self.service = EmbeddingIngestService()
+        self.pending: set[int] = set()
+        self.first_pending_at: Optional[float] = None
+
+    def listen(self) -> None:
+        connection.ensure_connection()
+        with connection.cursor() as cursor:
+            cursor.execute(f'LISTEN {connection.ops.quote_name(self.channel)}')
+
+    def poll(self, timeout: float) -> None:
+        raw = connection.connection
+        # notifications that arrived during a flush are already buffered on the connection
+        if not raw.notifies and select.select([raw], [], [], timeout) == ([], [], []):
+            return
+        raw.poll()
+        while raw.notifies:
+            notify = raw.notifies.pop(0)
+            try:
+                self.pending.add(int(notify.payload))
+            except ValueError:
+                logger.warning('Ignoring malformed %s payload: %r', self.channel, notify.payload)
+        if self.pending and self.first_pending_at is None:
+            self.first_pending_at = time.monotonic()
+
+    def due(self) -> bool:
+        if not self.pending:
+            return False
+        return len(self.pending) >= self.batch_size or time.monotonic() - self.first_pending_at >= self.max_wait
+
+    def flush(self) -> int:
+        ids, self.pending, self.first_pending_at = list(self.pending), set(), None
+        embedded = 0
+        try:
+            for articles in (self.service.get_articles_to_embed(), self.service.get_stale_articles()):
+                stats = self.service.save_claimed_embeddings(
+                    articles=articles.filter(id__in=ids),
+                    limit=len(ids),
+                    batch_size=self.batch_size,
+                )
+                embedded += stats['articles']
+        except Exception:
+            # retried on the next flush
+            self.pending.update(ids)
+            self.first_pending_at = time.monotonic()
+            raise
+        logger.info('Embedding listener: notified=%s embedded=%s', len(ids), embedded)
+        return embedded
+
+    def catch_up(self) -> int:
+        embedded = 0
+        for articles in (self.service.get_articles_to_embed(), self.service.get_stale_articles()):
+            stats = self.service.save_claimed_embeddings(
+                articles=articles,
+                limit=self.catch_up_limit,
+                batch_size=self.batch_size,
+            )
+            embedded += stats['articles']
+        logger.info('Embedding listener: caught up embedded=%s', embedded)
+        return embedded
+
+    @staticmethod
+    def connection_errors() -> tuple[type[Exception], ...]:
+        # raw.poll() raises the driver's exceptions, not Django's wrappers
+        driver = connection.Database
+        return OperationalError, InterfaceError, driver.OperationalError, driver.InterfaceError
+
+    def reconnect(self) -> None:
+        delay = 1.0
+        while True:
+            with suppress(DatabaseError, connection.Database.Error):
+                connection.close()
+            try:
+                self.listen()
+                self.catch_up()
+                return
+            except self.connection_errors() as e:
+                logger.warning('Embedding listener: reconnect failed (%s), retrying in %ss', e, delay)
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    def run(self, max_batches: Optional[int] = None) -> None:
+        self.listen()
+        logger.info('Embedding listener on %s (batch_size=%s, max_wait=%ss)', self.channel, self.batch_size, self.max_wait)
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            if self.first_pending_at is None:
+                timeout = self.max_wait
+            else:
+                timeout = max(0.0, self.max_wait - (time.monotonic() - self.first_pending_at))
+            try:
+                self.poll(timeout)
+                if self.due():
+                    self.flush()
+                    batches += 1
+            except self.connection_errors() as e:
+                logger.warning('Embedding listener: connection lost (%s), reconnecting', e)
+                self.reconnect()
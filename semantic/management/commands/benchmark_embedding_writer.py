@@ -0,0 +1,76 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from ingest.models import Article
+from semantic.models import IngestArticleEmbedding
+from semantic.writer import EmbeddingBulkWriter
+
+
+WRITERS = ('orm', 'bulk_create', 'copy')
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare embedding write throughput: per-row update_or_create, bulk_create upsert and COPY merge. '
+        'Writes random vectors for existing articles and rolls everything back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help='Articles to write per run (default: 2000)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per statement/batch (default: 500)')
+        parser.add_argument('--writers', nargs='+', choices=WRITERS, default=list(WRITERS))
+
+    def handle(self, *args, **options):
+        article_ids = list(Article.objects.order_by('id').values_list('id', flat=True)[:options['rows']])
+        if not article_ids:
+            raise CommandError('No articles to write embeddings for')
+
+        dimensions = EmbeddingBulkWriter.dimensions
+        vectors = np.random.default_rng(0).standard_normal((len(article_ids), dimensions), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        text_hashes = [f'{article_id:064x}' for article_id in article_ids]
+
+        for writer in options['writers']:
+            with transaction.atomic():
+                started = time.perf_counter()
+                getattr(self, f'write_{writer}')(article_ids, text_hashes, vectors, options['batch_size'])
+                seconds = time.perf_counter() - started
+                transaction.set_rollback(True)
+            self.stdout.write(
+                f'{writer:<12} rows={len(article_ids)} seconds={seconds:.3f} rows/sec={len(article_ids) / seconds:.1f}'
+            )
+
+    @staticmethod
+    def write_orm(article_ids, text_hashes, vectors, batch_size):
+        now = timezone.now()
+        for article_id, text_hash, vector in zip(article_ids, text_hashes, vectors.tolist()):
+            IngestArticleEmbedding.objects.update_or_create(
+                article_id=article_id,
+                defaults={'vector': vector, 'text_hash': text_hash, 'created_at': now},
+            )
+
+    @staticmethod
+    def write_bulk_create(article_ids, text_hashes, vectors, batch_size):
+        now = timezone.now()
+        for start in range(0, len(article_ids), batch_size):
+            end = start + batch_size
+            IngestArticleEmbedding.objects.bulk_create(
+                [
+                    IngestArticleEmbedding(article_id=article_id, vector=vector, text_hash=text_hash, created_at=now)
+                    for article_id, text_hash, vector in zip(article_ids[start:end], text_hashes[start:end], vectors[start:end].tolist())
+                ],
+                update_conflicts=True,
+                unique_fields=['article'],
+                update_fields=['vector', 'text_hash', 'created_at'],
+            )
+
+    @staticmethod
+    def write_copy(article_ids, text_hashes, vectors, batch_size):
+        writer = EmbeddingBulkWriter()
+        for start in range(0, len(article_ids), batch_size):
+            end = start + batch_size
+            writer.write(article_ids[start:end], text_hashes[start:end], vectors[start:end])
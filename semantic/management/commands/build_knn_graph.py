@@ -0,0 +1,31 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from semantic.knn import KnnGraphService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the ArticleNeighbor kNN graph with exact blocked matrix products over all embeddings.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--k', type=int, default=settings.SEMANTIC_KNN_K, help='Neighbours per article')
+        parser.add_argument(
+            '--block-size',
+            type=int,
+            default=2048,
+            help='Rows per score tile; peak memory ~ block_size^2 * 4 bytes (default: 2048)',
+        )
+
+    def handle(self, *args, **options):
+        service = KnnGraphService(k=options['k'], block_size=options['block_size'])
+
+        self.stdout.write(self.style.NOTICE(f'Building kNN graph (k={service.k}, block_size={service.block_size})...'))
+        started = time.perf_counter()
+        try:
+            written = service.build()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(f'Done. edges={written} seconds={time.perf_counter() - started:.1f}'))
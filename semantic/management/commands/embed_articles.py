@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from semantic.tasks import cold_start_articles_embedding
+
+
+class Command(BaseCommand):
+    help = 'Embed articles without an embedding using the claim-based batched backfill (safe to run on several hosts at once).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=1000,
+            help='Max number of articles to embed (default: 1000)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=32,
+            help='Texts per forward pass (default: 32)',
+        )
+
+    def handle(self, *args, **options):
+        stats = cold_start_articles_embedding(limit=options['limit'], batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Done. '
+            f'articles={stats['articles']} '
+            f'batches={stats['batches']} '
+            f'seconds={stats['seconds']} '
+            f'articles/sec={stats['articles_per_sec']}'
+        ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from semantic.listener import EmbeddingListener
+
+
+class Command(BaseCommand):
+    help = 'Embed articles within seconds of being persisted by listening for ingest NOTIFY events.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=32,
+            help='Flush once this many article ids are pending (default: 32)',
+        )
+        parser.add_argument(
+            '--max-wait',
+            type=float,
+            default=2.0,
+            help='Flush this many seconds after the first pending id (default: 2.0)',
+        )
+
+    def handle(self, *args, **options):
+        listener = EmbeddingListener(batch_size=options['batch_size'], max_wait=options['max_wait'])
+        self.stdout.write(self.style.NOTICE(f'Listening on {listener.channel}...'))
+        try:
+            listener.run()
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS('Stopped.'))
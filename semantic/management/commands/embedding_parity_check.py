@@ -0,0 +1,74 @@
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from semantic.models import IngestArticleEmbedding
+from semantic.providers import E5Provider
+from semantic.services import EmbeddingIngestService
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-embed a sample of articles with the configured backend (SEMANTIC_EMBEDDING_BACKEND) '
+        'and bound the cosine drift against the stored fp32 vectors.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sample',
+            type=int,
+            default=200,
+            help='Number of stored embeddings to compare (default: 200)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=16,
+            help='Texts per forward pass (default: 16)',
+        )
+        parser.add_argument(
+            '--max-drift',
+            type=float,
+            default=0.02,
+            help='Fail when mean 1 - cos(stored, new) exceeds this (default: 0.02)',
+        )
+        parser.add_argument(
+            '--max-drift-worst',
+            type=float,
+            default=0.05,
+            help='Fail when any single article drifts more than this (default: 0.05)',
+        )
+
+    def handle(self, *args, **options):
+        provider = E5Provider()
+        embeddings = list(
+            IngestArticleEmbedding.objects
+            .select_related('article', 'article__content')
+            .order_by('?')[:options['sample']]
+        )
+        if not embeddings:
+            raise CommandError('No stored embeddings to compare against')
+
+        self.stdout.write(self.style.NOTICE(
+            f'Comparing {len(embeddings)} embeddings (backend={provider.backend}, device={provider.device})...'
+        ))
+
+        drifts: list[float] = []
+        batch_size = options['batch_size']
+        for i in range(0, len(embeddings), batch_size):
+            batch = embeddings[i:i + batch_size]
+            texts = [EmbeddingIngestService.build_article_text(e.article) for e in batch]
+            new = np.asarray(provider.embed_docs(texts), dtype=np.float32)
+            stored = np.asarray([e.vector for e in batch], dtype=np.float32)
+            # both sides are L2-normalised
+            drifts.extend((1.0 - np.sum(new * stored, axis=1)).tolist())
+
+        mean_drift = float(np.mean(drifts))
+        worst_drift = float(np.max(drifts))
+        self.stdout.write(f'mean_drift={mean_drift:.5f} p95_drift={float(np.percentile(drifts, 95)):.5f} worst_drift={worst_drift:.5f}')
+
+        if mean_drift > options['max_drift'] or worst_drift > options['max_drift_worst']:
+            raise CommandError(
+                f'Cosine drift out of bounds: mean={mean_drift:.5f} (max {options['max_drift']}), '
+                f'worst={worst_drift:.5f} (max {options['max_drift_worst']})'
+            )
+        self.stdout.write(self.style.SUCCESS('Parity OK'))
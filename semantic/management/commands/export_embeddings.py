@@ -0,0 +1,33 @@
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+
+from semantic.snapshot import EmbeddingSnapshotService
+
+
+class Command(BaseCommand):
+    help = 'Stream IngestArticleEmbedding rows into a .npy snapshot directory (vectors + per-row columns + manifest).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=str, help='Snapshot directory')
+        parser.add_argument(
+            '--dtype',
+            type=str,
+            default='float32',
+            choices=['float32', 'float16'],
+            help='Vector matrix dtype (default: float32; float16 halves the size)',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per cursor fetch (default: 5000)')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        service = EmbeddingSnapshotService(batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.NOTICE(f'Exporting embeddings to {path}...'))
+        try:
+            manifest = service.export(path, dtype=options['dtype'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Done. rows={manifest['rows']} dimensions={manifest['dimensions']} dtype={manifest['dtype']}'
+        ))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from semantic.models import IngestArticleEmbedding
+from semantic.projection import ProjectionService
+
+
+class Command(BaseCommand):
+    help = 'Fit a new PCA projection on the stored embeddings, re-project every row and activate it.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Rows per IncrementalPCA step / bulk update (default: 2000)',
+        )
+        parser.add_argument(
+            '--no-activate',
+            action='store_true',
+            help='Only fit and store the new version',
+        )
+
+    def handle(self, *args, **options):
+        service = ProjectionService(batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.NOTICE(f'Fitting PCA to {IngestArticleEmbedding.REDUCED_DIMENSIONS} dimensions...'))
+        projection = service.fit()
+        self.stdout.write(
+            f'Fitted v{projection.version}: rows={projection.fitted_rows} '
+            f'explained_variance={projection.explained_variance:.4f}'
+        )
+        if options['no_activate']:
+            return
+
+        self.stdout.write(self.style.NOTICE('Re-projecting stored embeddings...'))
+        projected = service.roll_out(projection)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Done. v{projection.version} active, rows={projected}. '
+            f'Build its index with: manage.py rebuild_vector_index --kind pca'
+        ))
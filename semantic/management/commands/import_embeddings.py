@@ -0,0 +1,28 @@
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+
+from semantic.snapshot import EmbeddingSnapshotService
+
+
+class Command(BaseCommand):
+    help = 'Restore IngestArticleEmbedding rows from a snapshot made by export_embeddings.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=str, help='Snapshot directory')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk upsert (default: 5000)')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        service = EmbeddingSnapshotService(batch_size=options['batch_size'])
+
+        try:
+            manifest = service.read_manifest(path)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Invalid snapshot {path}: {e}')
+
+        self.stdout.write(self.style.NOTICE(
+            f'Restoring {manifest['rows']} embeddings ({manifest['dtype']}, created {manifest['created_at']})...'
+        ))
+        restored, skipped = service.restore(path)
+
+        self.stdout.write(self.style.SUCCESS(f'Done. restored={restored} skipped_missing_articles={skipped}'))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from semantic.prefork import find_processes, process_memory
+
+
+class Command(BaseCommand):
+    help = 'Per-process RSS/PSS of web/Celery workers, to check the model weights are shared across forks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pattern',
+            type=str,
+            default='celery',
+            help='Substring of the process command line (default: celery)',
+        )
+        parser.add_argument('--pid', type=int, action='append', help='Explicit pid(s) instead of --pattern')
+
+    def handle(self, *args, **options):
+        pids = options['pid'] or find_processes(options['pattern'])
+        if not pids:
+            raise CommandError(f'No processes matching "{options['pattern']}"')
+
+        total_rss = total_pss = 0
+        for pid in pids:
+            mem = process_memory(pid)
+            if mem is None:
+                continue
+            total_rss += mem['rss_kb']
+            total_pss += mem['pss_kb']
+            self.stdout.write(
+                f'{mem['pid']:>7} rss={mem['rss_kb'] // 1024}M pss={mem['pss_kb'] // 1024}M '
+                f'shared={mem['shared_kb'] // 1024}M private={mem['private_kb'] // 1024}M | {mem['cmdline'][:80]}'
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Total: processes={len(pids)} rss={total_rss // 1024}M pss={total_pss // 1024}M'
+        ))
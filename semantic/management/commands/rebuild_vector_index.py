@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from semantic.indexes import VectorIndexManager
+
+
+class Command(BaseCommand):
+    help = 'Rebuild an ANN index on IngestArticleEmbedding.vector concurrently (hnsw or ivfflat).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind',
+            type=str,
+            choices=['vector', 'halfvec', 'bit', 'pca'],
+            help='Indexed representation: float vector, halfvec cast, binary quantisation or PCA projection (default: vector)',
+        )
+        parser.add_argument(
+            '--method',
+            type=str,
+            choices=['hnsw', 'ivfflat'],
+            help='Index method (default: settings.SEMANTIC_VECTOR_INDEX)',
+        )
+        parser.add_argument('--m', type=int, help='hnsw: max connections per layer')
+        parser.add_argument('--ef-construction', type=int, help='hnsw: candidate list size at build time')
+        parser.add_argument('--lists', type=int, help='ivfflat: number of inverted lists')
+
+    def handle(self, *args, **options):
+        params = {
+            key: options[key]
+            for key in ('kind', 'method', 'm', 'ef_construction', 'lists')
+            if options[key] is not None
+        }
+        manager = VectorIndexManager(params=params)
+
+        for index in manager.existing_indexes():
+            self.stdout.write(f'Existing: {index['definition']}')
+
+        self.stdout.write(self.style.NOTICE(f'Building {manager.method} ({manager.with_clause()})...'))
+        build = manager.rebuild()
+
+        self.stdout.write(self.style.SUCCESS(f'Done. index={build.name} rows={build.row_count}'))
@@ -0,0 +1,64 @@
+import json
+import os
+import subprocess
+import sys
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Runs in a fresh interpreter, so nothing imported by this command skews the numbers
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+import importlib
+for module in sys.argv[1:]:
+    importlib.import_module(module)
+print(json.dumps({
+    'setup_seconds': setup_done - started,
+    'import_seconds': time.perf_counter() - setup_done,
+    'heavy_modules': sorted(m for m in ('torch', 'sentence_transformers', 'transformers') if m in sys.modules),
+}))
+'''
+
+DEFAULT_MODULES = ['config.urls', 'semantic.views', 'semantic.tasks', 'ingest.parsers.factroom.tasks']
+
+
+class Command(BaseCommand):
+    help = 'Measure cold django.setup() + import time of web/worker entry points and check no ML stack is imported.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'modules',
+            nargs='*',
+            default=DEFAULT_MODULES,
+            help=f'Modules to import after django.setup() (default: {" ".join(DEFAULT_MODULES)})',
+        )
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=3,
+            help='Number of fresh interpreters to average over (default: 3)',
+        )
+
+    def handle(self, *args, **options):
+        env = {**os.environ, 'SEMANTIC_PRELOAD_MODELS': '0'}
+        results = []
+        for _ in range(options['runs']):
+            proc = subprocess.run(
+                [sys.executable, '-c', PROBE, *options['modules']],
+                capture_output=True, text=True, env=env,
+            )
+            if proc.returncode != 0:
+                raise CommandError(proc.stderr.strip())
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+        setup = sum(r['setup_seconds'] for r in results) / len(results)
+        imports = sum(r['import_seconds'] for r in results) / len(results)
+        heavy = sorted({m for r in results for m in r['heavy_modules']})
+
+        self.stdout.write(f'setup={setup:.3f}s imports={imports:.3f}s total={setup + imports:.3f}s')
+        if heavy:
+            raise CommandError(f'Eagerly imported: {", ".join(heavy)}')
+        self.stdout.write(self.style.SUCCESS('No ML stack imported at startup'))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from semantic.indexes import VectorIndexMaintenance
+
+
+class Command(BaseCommand):
+    help = 'Re-cluster the ivfflat index when the corpus drifted from its build-time size.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rebuild regardless of drift',
+        )
+        parser.add_argument(
+            '--recall-sample',
+            type=int,
+            help='Queries used to measure recall before/after (default: settings)',
+        )
+
+    def handle(self, *args, **options):
+        result = VectorIndexMaintenance(recall_sample=options['recall_sample']).run(force=options['force'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Done. '
+            f'rebuilt={result['rebuilt']} '
+            f'rows={result['row_count']} '
+            f'built_rows={result['built_row_count']} '
+            f'drift={result['drift']} '
+            f'recall_before={result['recall_before']} '
+            f'recall_after={result['recall_after']}'
+        ))
@@ -0,0 +1,58 @@
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from semantic.indexes import INDEX_KINDS, VectorIndexManager, nearest_ids, search_profile
+from semantic.models import IngestArticleEmbedding
+
+
+class Command(BaseCommand):
+    help = 'Compare ANN indexes (float, halfvec, bit + float re-rank): index size, p95 latency and recall@k.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sample', type=int, default=100, help='Stored vectors used as queries (default: 100)')
+        parser.add_argument('--k', type=int, default=10, help='Recall cut-off (default: 10)')
+        parser.add_argument(
+            '--rerank-factor',
+            type=int,
+            default=settings.SEMANTIC_SEARCH_RERANK_FACTOR,
+            help='Compact-index candidates per result (default: settings)',
+        )
+        parser.add_argument('--profile', type=str, default=settings.SEMANTIC_SEARCH_PROFILE, help='Search profile')
+
+    def handle(self, *args, **options):
+        k = options['k']
+        queries = [
+            [float(x) for x in v]
+            for v in IngestArticleEmbedding.objects.order_by('?').values_list('vector', flat=True)[:options['sample']]
+        ]
+        if not queries:
+            raise CommandError('No stored embeddings to query with')
+
+        with search_profile('exact'):
+            exact = [set(nearest_ids(q, k)) for q in queries]
+
+        manager = VectorIndexManager()
+        indexed = {index['kind']: index for index in manager.existing_indexes()}
+        for kind in INDEX_KINDS:
+            index = indexed.get(kind)
+            if index is None:
+                self.stdout.write(f'{kind:>8}: no index')
+                continue
+
+            latencies: list[float] = []
+            recalls: list[float] = []
+            for query, truth in zip(queries, exact):
+                with search_profile(options['profile']):
+                    started = time.perf_counter()
+                    found = nearest_ids(query, k, kind=kind, rerank_factor=options['rerank_factor'])
+                    latencies.append(time.perf_counter() - started)
+                recalls.append(len(set(found) & truth) / len(truth) if truth else 1.0)
+
+            size = manager.index_size(index['name'])
+            self.stdout.write(
+                f'{kind:>8}: index={index['name']} size={(size or 0) / 2**20:.1f}MB '
+                f'p95={np.percentile(latencies, 95) * 1000:.2f}ms recall@{k}={np.mean(recalls):.4f}'
+            )
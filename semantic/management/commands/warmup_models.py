@@ -0,0 +1,20 @@
+import time
+from django.core.management.base import BaseCommand
+
+from semantic.providers import E5Provider
+
+
+class Command(BaseCommand):
+    help = 'Load the embedding model and run a warm-up pass (fills the HF cache on a fresh box).'
+
+    def handle(self, *args, **options):
+        provider = E5Provider()
+
+        self.stdout.write(self.style.NOTICE(f'Loading {provider.model_name}...'))
+        started = time.perf_counter()
+        provider.warmup()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Done. backend={provider.backend} device={provider.device} '
+            f'seconds={time.perf_counter() - started:.2f}'
+        ))
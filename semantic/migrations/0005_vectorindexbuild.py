@@ -0,0 +1,32 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('semantic', '0004_ivfflat_cosine'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VectorIndexBuild',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=128)),
+                ('method', models.CharField(max_length=16)),
+                ('params', models.JSONField(default=dict)),
+                ('row_count', models.PositiveBigIntegerField()),
+                ('recall_before', models.FloatField(blank=True, null=True)),
+                ('recall_after', models.FloatField(blank=True, null=True)),
+                ('built_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Vector Index Build',
+                'verbose_name_plural': 'Vector Index Builds',
+                'get_latest_by': 'built_at',
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+# Existing vectors were embedded from the current title/content, so seed their hashes
+# instead of treating the whole table as stale.
+BACKFILL_SQL = '''
+    UPDATE semantic_ingestarticleembedding AS e
+    SET text_hash = encode(sha256(convert_to(
+        e.model_name || E'\\n' || coalesce(a.title, '') || E'\\n' || coalesce(c.content_text, ''),
+        'UTF8'
+    )), 'hex')
+    FROM ingest_article AS a
+    LEFT JOIN ingest_articlecontent AS c ON c.article_id = a.id
+    WHERE a.id = e.article_id
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingest', '0004_articlecontent_search_vector'),
+        ('semantic', '0005_vectorindexbuild'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestarticleembedding',
+            name='model_name',
+            field=models.CharField(default='intfloat/multilingual-e5-large', max_length=128),
+        ),
+        migrations.AddField(
+            model_name='ingestarticleembedding',
+            name='text_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:00
+
+import django.utils.timezone
+import pgvector.django.vector
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('semantic', '0006_ingestarticleembedding_text_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmbeddingProjection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(unique=True)),
+                ('method', models.CharField(default='pca', max_length=32)),
+                ('dimensions', models.PositiveIntegerField()),
+                ('source_dimensions', models.PositiveIntegerField()),
+                ('mean', models.BinaryField()),
+                ('components', models.BinaryField()),
+                ('explained_variance', models.FloatField(blank=True, null=True)),
+                ('fitted_rows', models.PositiveBigIntegerField(default=0)),
+                ('is_active', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Embedding Projection',
+                'verbose_name_plural': 'Embedding Projections',
+                'get_latest_by': 'version',
+            },
+        ),
+        migrations.AddField(
+            model_name='ingestarticleembedding',
+            name='projection_version',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ingestarticleembedding',
+            name='vector_reduced',
+            field=pgvector.django.vector.VectorField(blank=True, dimensions=256, null=True),
+        ),
+    ]
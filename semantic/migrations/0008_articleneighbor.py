@@ -0,0 +1,32 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:00
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingest', '0005_corpus_version'),
+        ('semantic', '0007_embeddingprojection_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleNeighbor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='knn_neighbors', to='ingest.article')),
+                ('neighbor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='ingest.article')),
+            ],
+            options={
+                'verbose_name': 'Article Neighbor',
+                'verbose_name_plural': 'Article Neighbors',
+                'indexes': [models.Index(fields=['article', '-score'], name='semantic_neighbor_score_idx')],
+                'constraints': [models.UniqueConstraint(fields=('article', 'neighbor'), name='semantic_neighbor_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingest', '0005_corpus_version'),
+        ('semantic', '0008_articleneighbor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmbeddingClaim',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='embedding_claim', serialize=False, to='ingest.article')),
+                ('worker', models.CharField(max_length=128)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Embedding Claim',
+                'verbose_name_plural': 'Embedding Claims',
+            },
+        ),
+    ]
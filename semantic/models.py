@@ -5,6 +5,7 @@ from pgvector.django import VectorField
 
 class IngestArticleEmbedding(models.Model):
     MODEL = 'intfloat/multilingual-e5-large'
+    REDUCED_DIMENSIONS = 256
 
     article = models.OneToOneField(
         'ingest.Article',
@@ -13,6 +14,12 @@ class IngestArticleEmbedding(models.Model):
     )
 
     vector = VectorField(dimensions=1024)
+    # sha256 of model name + the exact text that was embedded, see EmbeddingIngestService.text_hash
+    model_name = models.CharField(max_length=128, default=MODEL)
+    text_hash = models.CharField(max_length=64, blank=True, default='')
+    # PCA projection of `vector` for first-stage candidate generation, see semantic.projection
+    vector_reduced = VectorField(dimensions=REDUCED_DIMENSIONS, null=True, blank=True)
+    projection_version = models.PositiveIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
@@ -21,3 +28,104 @@ class IngestArticleEmbedding(models.Model):
 
     def __str__(self):
         return str(self.article_id)
+
+
+class VectorIndexBuild(models.Model):
+    """
+    One row per ANN index (re)build: what was built and how big the corpus was at the time.
+    """
+    name = models.CharField(max_length=128)
+    method = models.CharField(max_length=16)
+    params = models.JSONField(default=dict)
+    row_count = models.PositiveBigIntegerField()
+    recall_before = models.FloatField(null=True, blank=True)
+    recall_after = models.FloatField(null=True, blank=True)
+    built_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Vector Index Build'
+        verbose_name_plural = 'Vector Index Builds'
+        get_latest_by = 'built_at'
+
+    def __str__(self):
+        return f'{self.name} ({self.row_count} rows)'
+
+
+class EmbeddingProjection(models.Model):
+    """
+    Versioned linear projection (PCA) from the model space to IngestArticleEmbedding.vector_reduced.
+    Stored in the database so every web/worker node applies the same artifact.
+    """
+    version = models.PositiveIntegerField(unique=True)
+    method = models.CharField(max_length=32, default='pca')
+    dimensions = models.PositiveIntegerField()
+    source_dimensions = models.PositiveIntegerField()
+    # float32 arrays: mean (source_dimensions,), components (dimensions, source_dimensions)
+    mean = models.BinaryField()
+    components = models.BinaryField()
+    explained_variance = models.FloatField(null=True, blank=True)
+    fitted_rows = models.PositiveBigIntegerField(default=0)
+    is_active = models.BooleanField(default=False)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Embedding Projection'
+        verbose_name_plural = 'Embedding Projections'
+        get_latest_by = 'version'
+
+    def __str__(self):
+        return f'{self.method} v{self.version} ({self.source_dimensions} -> {self.dimensions})'
+
+
+class ArticleNeighbor(models.Model):
+    """
+    Materialised kNN graph: the top-k most similar articles of every embedded article
+    by cosine similarity of IngestArticleEmbedding.vector, see semantic.knn.
+    """
+    article = models.ForeignKey(
+        'ingest.Article',
+        on_delete=models.CASCADE,
+        related_name='knn_neighbors',
+    )
+    neighbor = models.ForeignKey(
+        'ingest.Article',
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    score = models.FloatField()
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Article Neighbor'
+        verbose_name_plural = 'Article Neighbors'
+        constraints = [
+            models.UniqueConstraint(fields=['article', 'neighbor'], name='semantic_neighbor_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['article', '-score'], name='semantic_neighbor_score_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.article_id} -> {self.neighbor_id} ({self.score:.4f})'
+
+
+class EmbeddingClaim(models.Model):
+    """
+    Lease on an article a backfill worker is embedding; it expires, so the articles
+    of a crashed worker are claimed again, see EmbeddingIngestService.claim_articles.
+    """
+    article = models.OneToOneField(
+        'ingest.Article',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='embedding_claim',
+    )
+    worker = models.CharField(max_length=128)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = 'Embedding Claim'
+        verbose_name_plural = 'Embedding Claims'
+
+    def __str__(self):
+        return f'{self.article_id} by {self.worker} until {self.expires_at}'
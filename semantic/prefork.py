@@ -0,0 +1,82 @@
+from __future__ import annotations
+import gc
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Optional, TypedDict
+
+from .providers import E5Provider
+
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessMemory(TypedDict):
+    pid: int
+    cmdline: str
+    rss_kb: int
+    pss_kb: int
+    shared_kb: int
+    private_kb: int
+
+
+def preload_shared_model() -> None:
+    """
+    Load the embedding weights in the parent before the server/worker forks,
+    so prefork children (Celery prefork pool, gunicorn --preload) map the same
+    pages copy-on-write instead of each loading its own ~2 GB copy.
+
+    No forward pass here: running inference starts the OpenMP/intra-op thread
+    pool, which is not fork-safe. Children warm up on their first request.
+    """
+    E5Provider().load()
+    # keep the collector from writing to (and so un-sharing) every pre-fork object
+    gc.collect()
+    gc.freeze()
+    logger.info('Embedding model preloaded for fork: %s', process_memory())
+
+
+def _read_smaps_rollup(pid: int | str) -> dict[str, int]:
+    values: dict[str, int] = {}
+    for line in Path(f'/proc/{pid}/smaps_rollup').read_text().splitlines():
+        match = re.match(r'^(\w+):\s+(\d+) kB', line)
+        if match:
+            values[match.group(1)] = int(match.group(2))
+    return values
+
+
+def process_memory(pid: Optional[int] = None) -> Optional[ProcessMemory]:
+    """
+    RSS/PSS from /proc (Linux). PSS splits shared pages between the processes
+    mapping them, so the sum of PSS over workers is the real footprint.
+    None without /proc (macOS) or once the process has exited.
+    """
+    pid = pid or os.getpid()
+    try:
+        values = _read_smaps_rollup(pid)
+        cmdline = Path(f'/proc/{pid}/cmdline').read_bytes().replace(b'\0', b' ').decode(errors='replace').strip()
+    except OSError:
+        return None
+    return {
+        'pid': pid,
+        'cmdline': cmdline,
+        'rss_kb': values.get('Rss', 0),
+        'pss_kb': values.get('Pss', 0),
+        'shared_kb': values.get('Shared_Clean', 0) + values.get('Shared_Dirty', 0),
+        'private_kb': values.get('Private_Clean', 0) + values.get('Private_Dirty', 0),
+    }
+
+
+def find_processes(pattern: str) -> list[int]:
+    pids: list[int] = []
+    for entry in Path('/proc').iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            cmdline = (entry / 'cmdline').read_bytes().replace(b'\0', b' ').decode(errors='replace')
+        except OSError:
+            continue
+        if pattern in cmdline and int(entry.name) != os.getpid():
+            pids.append(int(entry.name))
+    return sorted(pids)
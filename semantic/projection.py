@@ -0,0 +1,146 @@
+from __future__ import annotations
+import logging
+import threading
+import time
+from itertools import batched
+from typing import Iterable, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+from django.db import transaction
+from django.db.models import Max
+
+from ingest.services.corpus_version import CorpusVersion
+from .models import EmbeddingProjection, IngestArticleEmbedding
+
+
+logger = logging.getLogger(__name__)
+
+
+class ProjectionService:
+    """
+    Fit, apply and roll out the PCA projection behind IngestArticleEmbedding.vector_reduced.
+
+    Fitting streams the stored vectors through IncrementalPCA, so memory stays bounded
+    by `batch_size` rows whatever the corpus size.
+    """
+
+    def __init__(self, batch_size: int = 2000) -> None:
+        self.batch_size = batch_size
+
+    @staticmethod
+    def to_arrays(projection: EmbeddingProjection) -> tuple[NDArray[np.float32], NDArray[np.float32]]:
+        mean = np.frombuffer(bytes(projection.mean), dtype=np.float32)
+        components = np.frombuffer(bytes(projection.components), dtype=np.float32).reshape(
+            projection.dimensions, projection.source_dimensions,
+        )
+        return mean, components
+
+    @classmethod
+    def transform(cls, projection: EmbeddingProjection, vectors: NDArray[np.float32]) -> NDArray[np.float32]:
+        mean, components = cls.to_arrays(projection)
+        return ((np.asarray(vectors, dtype=np.float32) - mean) @ components.T).astype(np.float32)
+
+    @classmethod
+    def transform_one(cls, projection: EmbeddingProjection, vector: list[float]) -> list[float]:
+        return cls.transform(projection, np.asarray([vector], dtype=np.float32))[0].tolist()
+
+    def _iter_vector_batches(
+        self,
+        exclude_version: Optional[int] = None,
+    ) -> Iterable[list[tuple[int, NDArray[np.float32]]]]:
+        rows = IngestArticleEmbedding.objects.all()
+        if exclude_version is not None:
+            # exclude() keeps NULL projection_version rows
+            rows = rows.exclude(projection_version=exclude_version)
+        rows = rows.order_by('id').values_list('id', 'vector').iterator(chunk_size=self.batch_size)
+        for batch in batched(rows, self.batch_size):
+            yield [(em_id, np.asarray(vector, dtype=np.float32)) for em_id, vector in batch]
+
+    def fit(self, dimensions: int = IngestArticleEmbedding.REDUCED_DIMENSIONS) -> EmbeddingProjection:
+        from sklearn.decomposition import IncrementalPCA
+
+        if dimensions != IngestArticleEmbedding.REDUCED_DIMENSIONS:
+            raise ValueError(f'vector_reduced has {IngestArticleEmbedding.REDUCED_DIMENSIONS} dimensions, got {dimensions}')
+
+        pca = IncrementalPCA(n_components=dimensions)
+        fitted_rows = 0
+        pending: list[NDArray[np.float32]] = []
+        for batch in self._iter_vector_batches():
+            pending.extend(vector for _, vector in batch)
+            # every partial_fit needs at least n_components rows
+            if len(pending) >= max(dimensions, self.batch_size):
+                pca.partial_fit(np.vstack(pending))
+                fitted_rows += len(pending)
+                pending = []
+        if len(pending) >= dimensions:
+            pca.partial_fit(np.vstack(pending))
+            fitted_rows += len(pending)
+        if not fitted_rows:
+            raise ValueError(f'Need at least {dimensions} stored embeddings to fit the projection')
+
+        version = (EmbeddingProjection.objects.aggregate(v=Max('version'))['v'] or 0) + 1
+        return EmbeddingProjection.objects.create(
+            version=version,
+            method='pca',
+            dimensions=dimensions,
+            source_dimensions=pca.components_.shape[1],
+            mean=pca.mean_.astype(np.float32).tobytes(),
+            components=pca.components_.astype(np.float32).tobytes(),
+            explained_variance=float(np.sum(pca.explained_variance_ratio_)),
+            fitted_rows=fitted_rows,
+        )
+
+    def project_all(self, projection: EmbeddingProjection, stale_only: bool = False) -> int:
+        projected = 0
+        for batch in self._iter_vector_batches(exclude_version=projection.version if stale_only else None):
+            reduced = self.transform(projection, np.vstack([vector for _, vector in batch]))
+            IngestArticleEmbedding.objects.bulk_update(
+                [
+                    IngestArticleEmbedding(id=em_id, vector_reduced=vector, projection_version=projection.version)
+                    for (em_id, _), vector in zip(batch, reduced)
+                ],
+                fields=['vector_reduced', 'projection_version'],
+            )
+            projected += len(batch)
+        return projected
+
+    def roll_out(self, projection: EmbeddingProjection) -> int:
+        """
+        Search falls back to the float index while rows are re-projected,
+        then the new version becomes active.
+
+        Embeddings written during the rewrite get no vector_reduced (nothing is active),
+        so a second pass after activation re-projects every row not on the new version.
+        Processes that cached the old projection (get_active_projection, 60s TTL) keep
+        searching and writing with it until their cache expires.
+        """
+        EmbeddingProjection.objects.filter(is_active=True).update(is_active=False)
+        projected = self.project_all(projection)
+        with transaction.atomic():
+            EmbeddingProjection.objects.filter(is_active=True).update(is_active=False)
+            EmbeddingProjection.objects.filter(pk=projection.pk).update(is_active=True)
+            CorpusVersion().bump()
+        projected += self.project_all(projection, stale_only=True)
+        logger.info('Projection v%s active: rows=%s', projection.version, projected)
+        return projected
+
+
+_active_projection: tuple[float, Optional[EmbeddingProjection]] = (float('-inf'), None)
+_active_projection_lock = threading.Lock()
+ACTIVE_PROJECTION_TTL = 60
+
+
+def get_active_projection() -> Optional[EmbeddingProjection]:
+    """
+    Active projection, re-read at most once a minute per process so a roll-out propagates.
+    """
+    global _active_projection
+    loaded_at, projection = _active_projection
+    if time.monotonic() - loaded_at < ACTIVE_PROJECTION_TTL:
+        return projection
+
+    with _active_projection_lock:
+        projection = EmbeddingProjection.objects.filter(is_active=True).first()
+        _active_projection = (time.monotonic(), projection)
+    return projection
@@ -1,21 +1,34 @@
 from __future__ import annotations
 import threading
-from typing import Optional, Self
+from typing import TYPE_CHECKING, Literal, Optional, Self
 
 import numpy as np
 from numpy.typing import NDArray
-import torch
-from sentence_transformers import SentenceTransformer
+from django.conf import settings
+
+from .batching import QueryBatcher
+
+if TYPE_CHECKING:
+    # torch / sentence_transformers are imported on first model load, not at import time
+    from sentence_transformers import SentenceTransformer
+
+EmbeddingBackend = Literal['torch', 'torch-int8', 'onnx']
 
 
 class _E5Singleton:
     """
     Thread-safe singleton for intfloat/multilingual-e5-large.
+
+    Backend comes from settings.SEMANTIC_EMBEDDING_BACKEND:
+      - torch: full-precision PyTorch
+      - torch-int8: PyTorch with Linear layers dynamically quantised to int8 (CPU only)
+      - onnx: exported ONNX graph run by onnxruntime (needs `optimum[onnxruntime]`)
     """
     _instance: Optional[Self] = None
     _lock = threading.RLock()
 
     model_name: str = 'intfloat/multilingual-e5-large'
+    cache_folder: str = './semantic/ml_models'
 
     def __new__(cls, *args, **kwargs) -> Self:
         if cls._instance is None:
@@ -28,16 +41,57 @@ class _E5Singleton:
         if getattr(self, '_init_done', False):
             return
 
-        self.device = device or self._auto_device()
-        self.model: SentenceTransformer = SentenceTransformer(
-            self.model_name,
-            device=self.device,
-            cache_folder='./semantic/ml_models',
-        )
-        self._init_done = True
+        with self._lock:
+            if getattr(self, '_init_done', False):
+                return
+
+            self.backend: EmbeddingBackend = settings.SEMANTIC_EMBEDDING_BACKEND
+            self.device = device or self._auto_device()
+            if self.backend != 'torch':
+                # quantised and onnx graphs are CPU builds
+                self.device = 'cpu'
+            self.model: SentenceTransformer = self._load_model(self.backend, self.device)
+            self._query_batcher: Optional[QueryBatcher] = None
+            self._init_done = True
+
+    @classmethod
+    def is_loaded(cls) -> bool:
+        return cls._instance is not None and getattr(cls._instance, '_init_done', False)
+
+    def get_query_batcher(self, encode_batch) -> QueryBatcher:
+        if self._query_batcher is None:
+            with self._lock:
+                if self._query_batcher is None:
+                    self._query_batcher = QueryBatcher(
+                        encode_batch=encode_batch,
+                        max_batch_size=settings.SEMANTIC_QUERY_BATCH_SIZE,
+                        max_wait_ms=settings.SEMANTIC_QUERY_BATCH_WAIT_MS,
+                    )
+        return self._query_batcher
+
+    @classmethod
+    def _load_model(cls, backend: EmbeddingBackend, device: str) -> SentenceTransformer:
+        from sentence_transformers import SentenceTransformer
+
+        if backend == 'onnx':
+            return SentenceTransformer(
+                cls.model_name,
+                device=device,
+                cache_folder=cls.cache_folder,
+                backend='onnx',
+                model_kwargs={'file_name': settings.SEMANTIC_EMBEDDING_ONNX_FILE},
+            )
+
+        model = SentenceTransformer(cls.model_name, device=device, cache_folder=cls.cache_folder)
+        if backend == 'torch-int8':
+            import torch
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model
 
     @staticmethod
     def _auto_device() -> str:
+        import torch
+
         if torch.cuda.is_available():
             return 'cuda'
         if hasattr(torch.backends, 'mps') and torch.backends.mps.is_available():  # type: ignore[attr-defined]
@@ -46,10 +100,48 @@ class _E5Singleton:
 
 
 class E5Provider:
+    """
+    Cheap to construct: the model is loaded on first use (or by warmup()),
+    so importing and instantiating search/ingest services costs nothing.
+    """
+    model_name: str = _E5Singleton.model_name
+
     def __init__(self, device: Optional[str] = None) -> None:
-        singleton = _E5Singleton(device=device)
-        self.model = singleton.model
-        self.device = singleton.device
+        self._device = device
+        self._singleton: Optional[_E5Singleton] = None
+
+    @property
+    def singleton(self) -> _E5Singleton:
+        if self._singleton is None:
+            self._singleton = _E5Singleton(device=self._device)
+        return self._singleton
+
+    @property
+    def model(self) -> SentenceTransformer:
+        return self.singleton.model
+
+    @property
+    def cache_name(self) -> str:
+        # from settings rather than self.backend, so a cache lookup never loads the model
+        return f'{self.model_name}:{settings.SEMANTIC_EMBEDDING_BACKEND}'
+
+    @property
+    def backend(self) -> EmbeddingBackend:
+        return self.singleton.backend
+
+    @property
+    def device(self) -> str:
+        return self.singleton.device
+
+    def load(self) -> _E5Singleton:
+        return self.singleton
+
+    def warmup(self) -> None:
+        """
+        Load the model and run one passage and one query through it.
+        """
+        self.embed_docs(['warmup'])
+        self.embed_queries(['warmup'])
 
     @staticmethod
     def _l2_normalize(x: NDArray[np.float32] | NDArray[np.float64]) -> NDArray[np.float32]:
@@ -57,23 +149,61 @@ class E5Provider:
         norms = np.linalg.norm(x, axis=1, keepdims=True) + 1e-12
         return (x / norms).astype(np.float32)
 
-    def embed_docs(self, texts: list[str]) -> list[list[float]]:
-        inputs = [f'passage: {t or ''}' for t in texts]
+    @staticmethod
+    def _doc_inputs(texts: list[str]) -> list[str]:
+        return [f'passage: {t or ''}' for t in texts]
+
+    def token_lengths(self, texts: list[str]) -> list[int]:
+        """
+        Token count of each passage as the model sees it (capped by max_seq_length).
+        """
+        max_len = self.model.get_max_seq_length() or 512
+        encoded = self.model.tokenizer(
+            self._doc_inputs(texts),
+            add_special_tokens=True,
+            truncation=True,
+            max_length=max_len,
+        )
+        return [len(ids) for ids in encoded['input_ids']]
+
+    def embed_docs_array(self, texts: list[str]) -> NDArray[np.float32]:
+        inputs = self._doc_inputs(texts)
         emb = self.model.encode(
             inputs,
             convert_to_numpy=True,
             show_progress_bar=False,
             normalize_embeddings=False,
         )
-        emb = self._l2_normalize(emb)
-        return emb.tolist()
+        return self._l2_normalize(emb)
 
-    def embed_query(self, text: str) -> list[float]:
+    def embed_docs(self, texts: list[str]) -> list[list[float]]:
+        return self.embed_docs_array(texts).tolist()
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
         q = self.model.encode(
-            [f'query: {(text or '').strip()}'],
+            [f'query: {(t or '').strip()}' for t in texts],
             convert_to_numpy=True,
             show_progress_bar=False,
             normalize_embeddings=False,
         )
-        q = self._l2_normalize(q)[0]
-        return q.tolist()
\ No newline at end of file
+        q = self._l2_normalize(q)
+        return q.tolist()
+
+    @property
+    def query_batcher(self) -> QueryBatcher:
+        return self.singleton.get_query_batcher(self.embed_queries)
+
+    @staticmethod
+    def loaded_query_batcher() -> Optional[QueryBatcher]:
+        """
+        The query batcher if this process already has one; never loads the model.
+        """
+        if not _E5Singleton.is_loaded():
+            return None
+        return _E5Singleton._instance._query_batcher
+
+    def embed_query(self, text: str) -> list[float]:
+        if settings.SEMANTIC_QUERY_BATCHING:
+            # concurrent callers share one forward pass
+            return self.query_batcher.embed(text)
+        return self.embed_queries([text])[0]
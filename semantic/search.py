@@ -1,13 +1,37 @@
-from typing import TypedDict, Literal, Optional
-from django.db.models import F, FloatField, QuerySet
+import base64
+import bisect
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypedDict, Literal, Optional, Callable, TypeVar
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, FloatField, Q, QuerySet
 from django.db.models.expressions import RawSQL, ExpressionWrapper, Value
-from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.contrib.postgres.search import SearchQuery, SearchRank
 from django.db.models.functions import Coalesce
 
+from .cache import (
+    QueryEmbeddingCache,
+    SearchResultCache,
+    get_query_embedding_cache,
+    get_search_result_cache,
+    normalize_query,
+)
+from .filters import ArticleFilter, SearchFilters, filtered_nearest_ids
+from .indexes import IndexKind, SearchProfile, nearest_ids, search_profile
+from ingest.models import Article, ArticleContent
 from .models import IngestArticleEmbedding
 from .providers import E5Provider
 
 
+Retrieval = Literal['exact', 'two_stage']
+Scoring = Literal['linear', 'rrf']
+SCORING_MODES: tuple[Scoring, ...] = ('linear', 'rrf')
+RETRIEVAL_MODES: tuple[Retrieval, ...] = ('exact', 'two_stage')
+
+T = TypeVar('T')
+
+
 class SearchHit(TypedDict):
     article_id: int
     url: str
@@ -15,6 +39,77 @@ class SearchHit(TypedDict):
     score: float
 
 
+BATCH_SEARCH_SQL = '''
+    WITH q AS (
+        SELECT idx, vec::vector AS vec, plainto_tsquery(%(config)s::regconfig, query) AS tsq
+        FROM unnest(%(idx)s::int[], %(texts)s::text[], %(vectors)s::text[]) AS u(idx, query, vec)
+    )
+    SELECT q.idx, a.id, a.url, a.title, hit.score
+    FROM q
+    CROSS JOIN LATERAL (
+        SELECT e.article_id,
+               0.8 * (1 - (e.vector <=> q.vec))
+               + 0.2 * coalesce(ts_rank(c.search_vector, q.tsq), 0) AS score
+        FROM (
+            (SELECT id FROM {embeddings} ORDER BY vector <=> q.vec LIMIT %(candidates)s)
+            UNION
+            (SELECT e2.id FROM {embeddings} AS e2
+             JOIN {contents} AS c2 ON c2.article_id = e2.article_id
+             WHERE c2.search_vector @@ q.tsq
+             ORDER BY ts_rank(c2.search_vector, q.tsq) DESC
+             LIMIT %(candidates)s)
+        ) AS candidates
+        JOIN {embeddings} AS e ON e.id = candidates.id
+        LEFT JOIN {contents} AS c ON c.article_id = e.article_id
+        ORDER BY score DESC
+        LIMIT %(limit)s
+    ) AS hit
+    JOIN {articles} AS a ON a.id = hit.article_id
+    ORDER BY q.idx, hit.score DESC
+'''.format(
+    embeddings=IngestArticleEmbedding._meta.db_table,
+    contents=ArticleContent._meta.db_table,
+    articles=Article._meta.db_table,
+)
+
+
+RELATED_SQL = '''
+    SELECT a.id, a.url, a.title, 1 - (e.vector <=> {source}) AS score
+    FROM {embeddings} AS e
+    JOIN {articles} AS a ON a.id = e.article_id
+    WHERE e.article_id <> %(article_id)s {filters}
+    ORDER BY e.vector <=> {source}
+    LIMIT %(limit)s
+'''
+
+
+class SearchPage(TypedDict):
+    results: list[SearchHit]
+    next_cursor: Optional[str]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(hit: SearchHit) -> str:
+    raw = json.dumps({'s': hit['score'], 'id': hit['article_id']}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return float(raw['s']), int(raw['id'])
+    except (ValueError, TypeError, KeyError) as e:
+        raise InvalidCursor('Malformed search cursor') from e
+
+
+def page_key(hit: SearchHit) -> tuple[float, int]:
+    # total order of a ranked list: score descending, article id ascending on ties
+    return -hit['score'], hit['article_id']
+
+
 class SearchService:
 
     def __init__(
@@ -22,6 +117,12 @@ class SearchService:
         embedding_provider: Optional[E5Provider] = None,
         language_config: Literal['russian'] = 'russian',
         max_limit: int = 50,
+        query_cache: Optional[QueryEmbeddingCache] = None,
+        retrieval: Optional[Retrieval] = None,
+        candidates: Optional[int] = None,
+        scoring: Optional[Scoring] = None,
+        profile: Optional[SearchProfile] = None,
+        result_cache: Optional[SearchResultCache] = None,
     ):
         self.embedding_provider = embedding_provider
         if embedding_provider is None:
@@ -29,26 +130,47 @@ class SearchService:
 
         self.language_config = language_config
         self.max_limit = max_limit
+        self.query_cache = query_cache or get_query_embedding_cache()
+        self.result_cache = result_cache or get_search_result_cache()
+        self.retrieval: Retrieval = retrieval or settings.SEMANTIC_SEARCH_RETRIEVAL
+        self.candidates = candidates or settings.SEMANTIC_SEARCH_CANDIDATES
+        self.scoring: Scoring = scoring or settings.SEMANTIC_SEARCH_SCORING
+        self.rrf_k: int = settings.SEMANTIC_SEARCH_RRF_K
+        self.rrf_parallel: bool = settings.SEMANTIC_SEARCH_RRF_PARALLEL
+        self.profile: SearchProfile = profile or settings.SEMANTIC_SEARCH_PROFILE
+        self.vector_index: IndexKind = settings.SEMANTIC_SEARCH_VECTOR_INDEX
+        self.rerank_factor: int = settings.SEMANTIC_SEARCH_RERANK_FACTOR
+        self.page_depth: int = settings.SEMANTIC_SEARCH_PAGE_DEPTH
 
     def embed_query(self, query: str) -> list[float]:
-        return self.embedding_provider.embed_query(text=query)
+        query = normalize_query(query)
+        encoder = self.embedding_provider.cache_name
 
-    def add_cosine_similarity(self, embeddings_queryset: QuerySet[IngestArticleEmbedding], query: str) -> QuerySet[IngestArticleEmbedding]:
+        vector = self.query_cache.get(encoder, query)
+        if vector is None:
+            vector = self.embedding_provider.embed_query(text=query)
+            self.query_cache.set(encoder, query, vector)
+        return vector
+
+    def add_cosine_similarity(
+        self,
+        embeddings_queryset: QuerySet[IngestArticleEmbedding],
+        query: str,
+        query_vector: Optional[list[float]] = None,
+    ) -> QuerySet[IngestArticleEmbedding]:
         sim_sql = '1 - (vector <=> %s::vector)'
+        if query_vector is None:
+            query_vector = self.embed_query(query)
         return embeddings_queryset.annotate(
-            cos_sim=RawSQL(sim_sql, (self.embed_query(query),), output_field=FloatField())
+            cos_sim=RawSQL(sim_sql, (query_vector,), output_field=FloatField())
         )
 
     def add_bm25(self, query: str, embeddings_queryset: QuerySet[IngestArticleEmbedding],) -> QuerySet[IngestArticleEmbedding]:
-        # TODO extra SearchVectorField for ingest.ArticleContent
+        # stored weighted tsvector (ingest.ArticleContent.search_vector), maintained by the persist services
         text_search = SearchQuery(query, config=self.language_config)
         return embeddings_queryset.annotate(
             bm25=Coalesce(
-                SearchRank(
-                    SearchVector('article__title', weight='A', config=self.language_config) +
-                    SearchVector('article__content__content_text', weight='B', config=self.language_config),
-                    text_search,
-                ),
+                SearchRank(F('article__content__search_vector'), text_search),
                 Value(0.0, output_field=FloatField()),
             )
         )
@@ -63,33 +185,341 @@ class SearchService:
             )
         )
 
-    def search(self, query: str, limit: int = 10) -> list[SearchHit]:
-        if not query.strip():
-            return []
+    def get_vector_candidates(
+        self,
+        query_vector: list[float],
+        n: int,
+        article_filter: Optional[ArticleFilter] = None,
+    ) -> list[int]:
+        """
+        Top-n embedding ids by `<=>` distance; a bare ORDER BY distance LIMIT n is served by the ANN index.
+        With a compact index (halfvec/bit/pca) the float vectors only re-rank its candidates.
+        Filtered searches pre-filter on the float vectors, see semantic.filters.
+        """
+        if article_filter:
+            return filtered_nearest_ids(query_vector, n, article_filter)
+        return nearest_ids(query_vector, n, kind=self.vector_index, rerank_factor=self.rerank_factor)
 
-        em_q: QuerySet[IngestArticleEmbedding] = IngestArticleEmbedding.objects.select_related(
-            'article', 'article__content'
-        )
-        em_q = self.add_cosine_similarity(
-            embeddings_queryset=em_q,
-            query=query,
-        )
-        em_q = self.add_bm25(
-            embeddings_queryset=em_q,
-            query=query,
+    def get_text_candidates(self, query: str, n: int, article_filter: Optional[ArticleFilter] = None) -> list[int]:
+        """
+        Top-n embedding ids by full-text rank; `@@` on the stored tsvector is served by the GIN index.
+        """
+        text_search = SearchQuery(query, config=self.language_config)
+        return list(
+            IngestArticleEmbedding.objects
+            .filter(article__content__search_vector=text_search)
+            .filter(article_filter.q() if article_filter else Q())
+            .annotate(rank=SearchRank(F('article__content__search_vector'), text_search))
+            .order_by('-rank')
+            .values_list('id', flat=True)[:n]
         )
-        em_q = self.add_score(
-            embeddings_queryset=em_q,
+
+    def get_candidates(
+        self,
+        query: str,
+        query_vector: list[float],
+        article_filter: Optional[ArticleFilter] = None,
+        n: Optional[int] = None,
+    ) -> set[int]:
+        n = n or self.candidates
+        return (
+            set(self.get_vector_candidates(query_vector, n=n, article_filter=article_filter))
+            | set(self.get_text_candidates(query, n=n, article_filter=article_filter))
         )
-        em_q = em_q.order_by('-score')[:max(1, min(limit, self.max_limit))]
+
+    @staticmethod
+    def _in_thread(func: Callable[[], T], profile: Optional[SearchProfile]) -> Callable[[], T]:
+        def run() -> T:
+            try:
+                with search_profile(profile):
+                    return func()
+            finally:
+                # worker threads get their own connection; don't leak it
+                connection.close()
+        return run
+
+    def get_ranked_lists(
+        self,
+        query: str,
+        query_vector: list[float],
+        n: int,
+        profile: Optional[SearchProfile] = None,
+        article_filter: Optional[ArticleFilter] = None,
+    ) -> tuple[list[int], list[int]]:
+        vector_retrieval = lambda: self.get_vector_candidates(query_vector, n=n, article_filter=article_filter)
+        text_retrieval = lambda: self.get_text_candidates(query, n=n, article_filter=article_filter)
+
+        if not self.rrf_parallel:
+            return vector_retrieval(), text_retrieval()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            vector_future = executor.submit(self._in_thread(vector_retrieval, profile))
+            text_future = executor.submit(self._in_thread(text_retrieval, profile))
+            return vector_future.result(), text_future.result()
+
+    @staticmethod
+    def fuse_rrf(ranked_lists: list[list[int]], k: int = 60) -> dict[int, float]:
+        """
+        Reciprocal rank fusion: sum of 1 / (k + rank) over every list the id appears in.
+        """
+        scores: dict[int, float] = {}
+        for ranked in ranked_lists:
+            for rank, em_id in enumerate(ranked, start=1):
+                scores[em_id] = scores.get(em_id, 0.0) + 1.0 / (k + rank)
+        return dict(sorted(scores.items(), key=lambda item: item[1], reverse=True))
+
+    def search_rrf(
+        self,
+        query: str,
+        limit: int,
+        profile: Optional[SearchProfile] = None,
+        query_vector: Optional[list[float]] = None,
+        article_filter: Optional[ArticleFilter] = None,
+    ) -> list[SearchHit]:
+        if query_vector is None:
+            query_vector = self.embed_query(query)
+        with search_profile(profile):
+            ranked_lists = self.get_ranked_lists(
+                query, query_vector, n=max(self.candidates, limit), profile=profile, article_filter=article_filter,
+            )
+
+            fused = self.fuse_rrf(list(ranked_lists), k=self.rrf_k)
+            top_ids = list(fused)[:limit]
+            embeddings = IngestArticleEmbedding.objects.select_related('article').in_bulk(top_ids)
 
         return [
             {
                 'article_id': e.article.id,
                 'url': e.article.url,
                 'title': e.article.title or e.article.url,
-                'score': float(e.score),
+                'score': fused[em_id],
             }
-            for e in em_q
+            for em_id in top_ids
+            if (e := embeddings.get(em_id)) is not None
         ]
 
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        retrieval: Optional[Retrieval] = None,
+        scoring: Optional[Scoring] = None,
+        profile: Optional[SearchProfile] = None,
+        filters: Optional[SearchFilters] = None,
+    ) -> list[SearchHit]:
+        if not query.strip():
+            return []
+
+        limit, retrieval, scoring, profile = self.resolve_options(limit, retrieval, scoring, profile)
+        return self.ranked(query, limit, retrieval, scoring, profile, ArticleFilter(filters))
+
+    def ranked(
+        self,
+        query: str,
+        limit: int,
+        retrieval: Retrieval,
+        scoring: Scoring,
+        profile: SearchProfile,
+        article_filter: ArticleFilter,
+    ) -> list[SearchHit]:
+        """
+        Top `limit` hits (not clamped to max_limit) through the result cache.
+        """
+        if scoring == 'rrf':
+            compute = lambda: self.search_rrf(query, limit=limit, profile=profile, article_filter=article_filter)
+        else:
+            compute = lambda: self.search_linear(
+                query, limit=limit, retrieval=retrieval, profile=profile, article_filter=article_filter,
+            )
+        params = self.cache_params(limit, retrieval, scoring, profile, article_filter)
+        return self.result_cache.get_or_compute(query, params, compute)
+
+    def resolve_options(
+        self,
+        limit: int,
+        retrieval: Optional[Retrieval],
+        scoring: Optional[Scoring],
+        profile: Optional[SearchProfile],
+    ) -> tuple[int, Retrieval, Scoring, SearchProfile]:
+        return (
+            max(1, min(limit, self.max_limit)),
+            retrieval or self.retrieval,
+            scoring or self.scoring,
+            profile or self.profile,
+        )
+
+    def cache_params(
+        self,
+        limit: int,
+        retrieval: Retrieval,
+        scoring: Scoring,
+        profile: SearchProfile,
+        article_filter: Optional[ArticleFilter] = None,
+    ) -> tuple:
+        # everything that changes the ranking is part of the result cache key
+        return (
+            self.embedding_provider.cache_name, limit, scoring, retrieval, profile, self.vector_index, self.candidates,
+            article_filter.cache_key() if article_filter else (),
+        )
+
+    def search_linear(
+        self,
+        query: str,
+        limit: int,
+        retrieval: Retrieval,
+        profile: Optional[SearchProfile] = None,
+        query_vector: Optional[list[float]] = None,
+        article_filter: Optional[ArticleFilter] = None,
+    ) -> list[SearchHit]:
+        if query_vector is None:
+            query_vector = self.embed_query(query)
+
+        with search_profile(profile):
+            em_q: QuerySet[IngestArticleEmbedding] = IngestArticleEmbedding.objects.select_related(
+                'article', 'article__content'
+            )
+            if article_filter:
+                em_q = em_q.filter(article_filter.q())
+            if retrieval == 'two_stage':
+                # blend only over the union of ANN and full-text candidates
+                em_q = em_q.filter(id__in=self.get_candidates(
+                    query, query_vector, article_filter=article_filter, n=max(self.candidates, limit),
+                ))
+
+            em_q = self.add_cosine_similarity(
+                embeddings_queryset=em_q,
+                query=query,
+                query_vector=query_vector,
+            )
+            em_q = self.add_bm25(
+                embeddings_queryset=em_q,
+                query=query,
+            )
+            em_q = self.add_score(
+                embeddings_queryset=em_q,
+            )
+            em_q = em_q.order_by('-score')[:limit]
+
+            return [
+                {
+                    'article_id': e.article.id,
+                    'url': e.article.url,
+                    'title': e.article.title or e.article.url,
+                    'score': float(e.score),
+                }
+                for e in em_q
+            ]
+
+    def search_many(
+        self,
+        queries: list[str],
+        limit: int = 10,
+        profile: Optional[SearchProfile] = None,
+    ) -> list[list[SearchHit]]:
+        """
+        Linear two-stage search for many queries at once: one batched forward pass and one
+        SQL statement that runs the per-query candidate union + blend in a LATERAL join
+        over the unnested query vectors. Results follow the order of `queries`.
+        """
+        results: list[list[SearchHit]] = [[] for _ in queries]
+        texts = [normalize_query(query) for query in queries]
+        idx = [i for i, text in enumerate(texts) if text]
+        if not idx:
+            return results
+
+        limit = max(1, min(limit, self.max_limit))
+        vectors = self.embedding_provider.embed_queries([texts[i] for i in idx])
+        params = {
+            'config': self.language_config,
+            'idx': idx,
+            'texts': [texts[i] for i in idx],
+            'vectors': [str(vector) for vector in vectors],
+            'candidates': max(self.candidates, limit),
+            'limit': limit,
+        }
+
+        with search_profile(profile or self.profile), connection.cursor() as cursor:
+            cursor.execute(BATCH_SEARCH_SQL, params)
+            for i, article_id, url, title, score in cursor.fetchall():
+                results[i].append({
+                    'article_id': article_id,
+                    'url': url,
+                    'title': title or url,
+                    'score': float(score),
+                })
+        return results
+
+    def related(
+        self,
+        article_id: int,
+        limit: int = 10,
+        filters: Optional[SearchFilters] = None,
+        profile: Optional[SearchProfile] = None,
+    ) -> list[SearchHit]:
+        """
+        Nearest articles to an already embedded article, by its stored vector: no model
+        inference, one ANN index scan (the ORDER BY operand is a one-row InitPlan, which
+        pgvector treats as a constant). Filtered lookups pre-filter like search does, see
+        semantic.filters. Raises IngestArticleEmbedding.DoesNotExist when the article has
+        no embedding yet.
+        """
+        if not IngestArticleEmbedding.objects.filter(article_id=article_id).exists():
+            raise IngestArticleEmbedding.DoesNotExist(f'Article {article_id} has no embedding')
+
+        article_filter = ArticleFilter(filters)
+        params = {'article_id': article_id, 'limit': max(1, min(limit, self.max_limit))}
+        with search_profile(profile or self.profile):
+            filters_sql = ''
+            if article_filter:
+                # one extra: the source article itself may match the filter
+                vector = IngestArticleEmbedding.objects.values_list('vector', flat=True).get(article_id=article_id)
+                params['ids'] = filtered_nearest_ids(vector.tolist(), params['limit'] + 1, article_filter)
+                filters_sql = 'AND e.id = ANY(%(ids)s)'
+
+            sql = RELATED_SQL.format(
+                source=f'(SELECT vector FROM {IngestArticleEmbedding._meta.db_table} WHERE article_id = %(article_id)s)',
+                embeddings=IngestArticleEmbedding._meta.db_table,
+                articles=Article._meta.db_table,
+                filters=filters_sql,
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                return [
+                    {'article_id': pk, 'url': url, 'title': title or url, 'score': float(score)}
+                    for pk, url, title, score in cursor.fetchall()
+                ]
+
+    def search_page(
+        self,
+        query: str,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        retrieval: Optional[Retrieval] = None,
+        scoring: Optional[Scoring] = None,
+        profile: Optional[SearchProfile] = None,
+        filters: Optional[SearchFilters] = None,
+    ) -> SearchPage:
+        """
+        Keyset pagination over the top SEMANTIC_SEARCH_PAGE_DEPTH hits. The ranked list is
+        computed once and kept in the result cache, so later pages are a cache hit plus a
+        binary search for the cursor's (score, article id). Should the list have been
+        evicted or the corpus changed, it is recomputed and paging resumes strictly after
+        the cursor position, so no hit is repeated.
+        """
+        if not query.strip():
+            return {'results': [], 'next_cursor': None}
+
+        after = decode_cursor(cursor) if cursor else None
+        limit, retrieval, scoring, profile = self.resolve_options(limit, retrieval, scoring, profile)
+        hits = sorted(
+            self.ranked(query, self.page_depth, retrieval, scoring, profile, ArticleFilter(filters)),
+            key=page_key,
+        )
+
+        start = bisect.bisect_right(hits, (-after[0], after[1]), key=page_key) if after else 0
+        page = hits[start:start + limit]
+        has_more = start + limit < len(hits)
+        return {
+            'results': page,
+            'next_cursor': encode_cursor(page[-1]) if page and has_more else None,
+        }
@@ -1,8 +1,40 @@
-from django.db import transaction
+import hashlib
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import timedelta
+from itertools import batched
+from typing import Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import CharField, F, Func, Q, QuerySet, Value
+from django.db.models.functions import Coalesce, Concat
+from django.utils import timezone
 
 from ingest.models import Article
-from .models import IngestArticleEmbedding
+from ingest.services.corpus_version import CorpusVersion
+from .models import EmbeddingClaim, IngestArticleEmbedding
+from .knn import KnnGraphService
+from .projection import ProjectionService, get_active_projection
 from .providers import E5Provider
+from .types import EmbeddingBackfillStats
+from .writer import EmbeddingBulkWriter
+
+
+logger = logging.getLogger(__name__)
+
+CLAIMS = EmbeddingClaim._meta.db_table
+
+
+class TextSHA256(Func):
+    """
+    Hex sha256 of a text expression using core Postgres (no pgcrypto).
+    """
+    template = "encode(sha256(convert_to(%(expressions)s, 'UTF8')), 'hex')"
+    output_field = CharField()
 
 
 class EmbeddingService:
@@ -10,19 +42,205 @@ class EmbeddingService:
 
 
 class EmbeddingIngestService(EmbeddingService):
+    # how many batches are read ahead and length-sorted together
+    SORT_POOL_BATCHES = 8
 
     @staticmethod
     def build_article_text(article: Article) -> str:
         return (article.title or '') + '\n' + (article.content.content_text or '')
 
+    @staticmethod
+    def text_hash(text: str, model_name: str = IngestArticleEmbedding.MODEL) -> str:
+        return hashlib.sha256(f'{model_name}\n{text}'.encode()).hexdigest()
+
+    @staticmethod
+    def text_hash_expression(model_name: str = IngestArticleEmbedding.MODEL) -> TextSHA256:
+        """
+        SQL twin of text_hash(build_article_text(article)) for Article querysets.
+        """
+        return TextSHA256(Concat(
+            Value(f'{model_name}\n'),
+            Coalesce('title', Value('')),
+            Value('\n'),
+            Coalesce('content__content_text', Value('')),
+            output_field=CharField(),
+        ))
+
+    @staticmethod
+    def get_articles_to_embed() -> QuerySet[Article]:
+        return Article.objects.filter(
+            content__content_html__isnull=False,
+            content__content_text__isnull=False,
+            embedding_e5_large__isnull=True,
+        ).select_related('content').order_by('id')
+
+    def get_stale_articles(self) -> QuerySet[Article]:
+        """
+        Embedded articles whose current title/content no longer match the embedded text hash.
+        """
+        return Article.objects.filter(
+            content__content_text__isnull=False,
+            embedding_e5_large__isnull=False,
+        ).alias(
+            current_hash=self.text_hash_expression(),
+        ).filter(
+            ~Q(embedding_e5_large__text_hash=F('current_hash')),
+        ).select_related('content').order_by('id')
+
     @transaction.atomic
-    def save_article_embedding(self, article: Article) -> IngestArticleEmbedding:
+    def save_article_embedding(self, article: Article, force: bool = False) -> IngestArticleEmbedding:
         text = self.build_article_text(article)
+        text_hash = self.text_hash(text)
+
+        existing = IngestArticleEmbedding.objects.filter(article=article).first()
+        if not force and existing is not None and existing.text_hash == text_hash:
+            return existing
+
         provider = E5Provider()
         vector = provider.embed_docs([text])[0]
+        reduced, projection_version = self.project([vector])
 
         embedding, _ = IngestArticleEmbedding.objects.update_or_create(
             article=article,
-            defaults={'vector': vector},
+            defaults={
+                'vector': vector,
+                'model_name': provider.model_name,
+                'text_hash': text_hash,
+                'vector_reduced': reduced[0],
+                'projection_version': projection_version,
+                'created_at': timezone.now(),
+            },
+        )
+        CorpusVersion().bump()
+        if settings.SEMANTIC_KNN_GRAPH:
+            KnnGraphService(k=settings.SEMANTIC_KNN_K).update_articles([article.id])
+        return embedding
+
+    @staticmethod
+    def project(vectors: list[list[float]]) -> tuple[list, Optional[int]]:
+        """
+        vector_reduced values under the active projection (None when nothing is rolled out).
+        """
+        projection = get_active_projection()
+        if projection is None:
+            return [None] * len(vectors), None
+        return list(ProjectionService.transform(projection, vectors)), projection.version
+
+    def iter_length_sorted_batches(
+        self,
+        articles: Iterable[Article],
+        batch_size: int,
+        provider: E5Provider,
+    ) -> Iterator[list[tuple[Article, str]]]:
+        """
+        Read a pool of articles ahead, sort it by token length and cut it into batches,
+        so every forward pass pads to texts of similar length.
+        """
+        for pool in batched(articles, batch_size * self.SORT_POOL_BATCHES):
+            items = [(article, self.build_article_text(article)) for article in pool]
+            lengths = provider.token_lengths([text for _, text in items])
+            order = sorted(range(len(items)), key=lengths.__getitem__)
+            for chunk in batched(order, batch_size):
+                yield [items[i] for i in chunk]
+
+    def save_embeddings_batch(self, items: list[tuple[Article, str]], provider: E5Provider) -> int:
+        """
+        Encode one batch and COPY it into the table; the matrix never becomes Python floats.
+        """
+        vectors = provider.embed_docs_array([text for _, text in items])
+        projection = get_active_projection()
+        written = EmbeddingBulkWriter().write(
+            article_ids=[article.id for article, _ in items],
+            text_hashes=[self.text_hash(text, provider.model_name) for _, text in items],
+            vectors=vectors,
+            model_name=provider.model_name,
+            reduced=ProjectionService.transform(projection, vectors) if projection else None,
+            projection_version=projection.version if projection else None,
+        )
+        if settings.SEMANTIC_KNN_GRAPH:
+            KnnGraphService(k=settings.SEMANTIC_KNN_K).update_articles([article.id for article, _ in items])
+        return written
+
+    def claim_articles(self, articles: QuerySet[Article], n: int, worker: str) -> list[Article]:
+        """
+        Lease up to `n` articles of `articles` to `worker` for SEMANTIC_EMBEDDING_CLAIM_TTL
+        seconds. Row locks (FOR UPDATE SKIP LOCKED) are held only for this short claim
+        transaction, never across a forward pass; an article whose lease expired (crashed
+        worker) can be claimed again.
+        """
+        now = timezone.now()
+        expires_at = now + timedelta(seconds=settings.SEMANTIC_EMBEDDING_CLAIM_TTL)
+        with transaction.atomic():
+            candidate_ids = list(
+                articles.exclude(embedding_claim__expires_at__gt=now)
+                .select_for_update(skip_locked=True, of=('self',))
+                .values_list('id', flat=True)[:n]
+            )
+            if not candidate_ids:
+                return []
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'''
+                    INSERT INTO {CLAIMS} AS c (article_id, worker, expires_at)
+                    SELECT unnest(%s::bigint[]), %s, %s
+                    ON CONFLICT (article_id) DO UPDATE SET
+                        worker = EXCLUDED.worker,
+                        expires_at = EXCLUDED.expires_at
+                    WHERE c.expires_at <= %s
+                    RETURNING article_id
+                    ''',
+                    [candidate_ids, worker, expires_at, now],
+                )
+                claimed_ids = [row[0] for row in cursor.fetchall()]
+        return list(Article.objects.filter(id__in=claimed_ids).select_related('content').order_by('id'))
+
+    @staticmethod
+    def release_claims(article_ids: list[int], worker: str) -> int:
+        deleted, _ = EmbeddingClaim.objects.filter(article_id__in=article_ids, worker=worker).delete()
+        return deleted
+
+    def save_claimed_embeddings(
+        self,
+        articles: QuerySet[Article],
+        limit: int = 1000,
+        batch_size: int = 32,
+    ) -> EmbeddingBackfillStats:
+        """
+        Multi-worker backfill: lease a pool of `batch_size * SORT_POOL_BATCHES` articles,
+        embed it in length-sorted batches outside any transaction, COPY-merge each batch,
+        then release the lease; repeat until `limit` or nothing is left to claim. Any
+        number of workers can drain the same queryset; a written article no longer
+        matches `articles` (no embedding / stale hash), so it is never claimed again.
+        """
+        provider = E5Provider()
+        worker = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        stats: EmbeddingBackfillStats = {
+            'articles': 0,
+            'batches': 0,
+            'seconds': 0.0,
+            'articles_per_sec': 0.0,
+        }
+
+        started = time.perf_counter()
+        while stats['articles'] < limit:
+            pool_size = min(batch_size * self.SORT_POOL_BATCHES, limit - stats['articles'])
+            claimed = self.claim_articles(articles, pool_size, worker)
+            if not claimed:
+                break
+            try:
+                for items in self.iter_length_sorted_batches(claimed, batch_size=batch_size, provider=provider):
+                    self.save_embeddings_batch(items, provider=provider)
+                    stats['batches'] += 1
+            finally:
+                self.release_claims([article.id for article in claimed], worker)
+            stats['articles'] += len(claimed)
+
+        stats['seconds'] = round(time.perf_counter() - started, 3)
+        if stats['seconds'] > 0:
+            stats['articles_per_sec'] = round(stats['articles'] / stats['seconds'], 2)
+
+        logger.info(
+            'Claimed embedding backfill: articles=%s batches=%s seconds=%s articles/sec=%s',
+            stats['articles'], stats['batches'], stats['seconds'], stats['articles_per_sec'],
         )
-        return embedding
\ No newline at end of file
+        return stats
@@ -0,0 +1,152 @@
+from __future__ import annotations
+import json
+import logging
+from itertools import batched
+from pathlib import Path
+from typing import Literal, TypedDict
+
+import numpy as np
+from django.utils import timezone
+
+from ingest.models import Article
+from .models import IngestArticleEmbedding
+from .projection import get_active_projection, ProjectionService
+from .writer import EmbeddingBulkWriter
+
+
+logger = logging.getLogger(__name__)
+
+SnapshotDType = Literal['float32', 'float16']
+
+SNAPSHOT_FORMAT = 1
+MANIFEST = 'manifest.json'
+VECTORS = 'vectors.npy'
+ARTICLE_IDS = 'article_ids.npy'
+TEXT_HASHES = 'text_hashes.npy'
+MODEL_NAMES = 'model_names.npy'
+
+
+class SnapshotManifest(TypedDict):
+    format: int
+    rows: int
+    dimensions: int
+    dtype: SnapshotDType
+    created_at: str
+
+
+class EmbeddingSnapshotService:
+    """
+    IngestArticleEmbedding <-> directory snapshot:
+
+    - vectors.npy: contiguous (rows, dimensions) float32/float16 matrix
+    - article_ids.npy, text_hashes.npy, model_names.npy: per-row columns
+    - manifest.json: sidecar with row count, dimensions and dtype
+
+    Export fills memory-mapped .npy files from a server-side cursor and restore reads
+    them memory-mapped, so both stay within `batch_size` rows of RAM.
+    """
+
+    def __init__(self, batch_size: int = 5000) -> None:
+        self.batch_size = batch_size
+
+    def export(self, path: Path, dtype: SnapshotDType = 'float32') -> SnapshotManifest:
+        path.mkdir(parents=True, exist_ok=True)
+        dimensions = IngestArticleEmbedding._meta.get_field('vector').dimensions
+
+        # rows added while exporting are left for the next snapshot
+        last_id = IngestArticleEmbedding.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        queryset = IngestArticleEmbedding.objects.filter(id__lte=last_id).order_by('id')
+        rows = queryset.count()
+        if not rows:
+            raise ValueError('No embeddings to export')
+
+        vectors = np.lib.format.open_memmap(path / VECTORS, mode='w+', dtype=dtype, shape=(rows, dimensions))
+        article_ids = np.lib.format.open_memmap(path / ARTICLE_IDS, mode='w+', dtype=np.int64, shape=(rows,))
+        text_hashes = np.lib.format.open_memmap(path / TEXT_HASHES, mode='w+', dtype='S64', shape=(rows,))
+        model_names = np.lib.format.open_memmap(path / MODEL_NAMES, mode='w+', dtype='S128', shape=(rows,))
+
+        stream = queryset.values_list('article_id', 'text_hash', 'model_name', 'vector').iterator(chunk_size=self.batch_size)
+        written = unhashed = 0
+        for batch in batched(stream, self.batch_size):
+            end = min(written + len(batch), rows)
+            batch = batch[:end - written]
+            article_ids[written:end] = [row[0] for row in batch]
+            text_hashes[written:end] = [row[1].encode() for row in batch]
+            unhashed += sum(len(row[1]) != 64 for row in batch)
+            model_names[written:end] = [row[2].encode() for row in batch]
+            vectors[written:end] = np.asarray([row[3] for row in batch], dtype=np.float32)
+            written = end
+            if written >= rows:
+                break
+
+        for array in (vectors, article_ids, text_hashes, model_names):
+            array.flush()
+        if unhashed:
+            logger.warning('Snapshot export: %s rows without a text hash will be skipped on restore', unhashed)
+
+        manifest: SnapshotManifest = {
+            'format': SNAPSHOT_FORMAT,
+            'rows': written,
+            'dimensions': dimensions,
+            'dtype': dtype,
+            'created_at': timezone.now().isoformat(),
+        }
+        (path / MANIFEST).write_text(json.dumps(manifest, indent=2))
+        return manifest
+
+    @staticmethod
+    def read_manifest(path: Path) -> SnapshotManifest:
+        manifest: SnapshotManifest = json.loads((path / MANIFEST).read_text())
+        if manifest['format'] != SNAPSHOT_FORMAT:
+            raise ValueError(f'Unsupported snapshot format {manifest['format']}')
+        return manifest
+
+    def restore(self, path: Path) -> tuple[int, int]:
+        """
+        Upsert snapshot rows whose article exists here; returns (restored, skipped).
+        Rows without a full text hash are skipped too: the writer can't store them, and
+        the cold start backfill embeds those articles again.
+        """
+        manifest = self.read_manifest(path)
+        rows = manifest['rows']
+        if not rows:
+            return 0, 0
+        vectors = np.load(path / VECTORS, mmap_mode='r')
+        article_ids = np.load(path / ARTICLE_IDS, mmap_mode='r')
+        text_hashes = np.load(path / TEXT_HASHES, mmap_mode='r')
+        model_names = np.load(path / MODEL_NAMES, mmap_mode='r')
+
+        projection = get_active_projection()
+        writer = EmbeddingBulkWriter()
+        restored = skipped = 0
+        for start in range(0, rows, self.batch_size):
+            end = min(start + self.batch_size, rows)
+            ids = article_ids[start:end].tolist()
+            existing = set(Article.objects.filter(id__in=ids).values_list('id', flat=True))
+            hashed = [len(text_hash) == 64 for text_hash in text_hashes[start:end]]
+            keep = [i for i, article_id in enumerate(ids) if article_id in existing and hashed[i]]
+            if not all(hashed):
+                logger.warning(
+                    'Snapshot restore: skipping %s rows without a text hash, articles %s',
+                    hashed.count(False), [article_id for article_id, ok in zip(ids, hashed) if not ok][:20],
+                )
+            skipped += len(ids) - len(keep)
+            if not keep:
+                continue
+
+            batch_vectors = np.asarray(vectors[start:end][keep], dtype=np.float32)
+            batch_models = model_names[start:end][keep]
+            # the writer stamps one model name per statement
+            for model_name in np.unique(batch_models):
+                rows_for_model = np.flatnonzero(batch_models == model_name)
+                model_vectors = batch_vectors[rows_for_model]
+                writer.write(
+                    article_ids=[ids[keep[i]] for i in rows_for_model],
+                    text_hashes=[text_hashes[start + keep[i]].decode() for i in rows_for_model],
+                    vectors=model_vectors,
+                    model_name=model_name.decode(),
+                    reduced=ProjectionService.transform(projection, model_vectors) if projection else None,
+                    projection_version=projection.version if projection else None,
+                )
+            restored += len(keep)
+        return restored, skipped
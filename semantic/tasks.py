@@ -1,20 +1,45 @@
+from typing import Optional
+
 from celery import shared_task
-from ingest.models import Article
+from django.conf import settings
+
+from semantic.indexes import VectorIndexMaintenance
 from semantic.services import EmbeddingIngestService
+from semantic.types import EmbeddingBackfillStats
 
 
-def cold_start_articles_embedding(limit: int = 1000) -> None:
+def cold_start_articles_embedding(limit: int = 1000, batch_size: Optional[int] = None) -> Optional[EmbeddingBackfillStats]:
     service = EmbeddingIngestService()
 
-    articles = Article.objects.filter(
-        content__content_html__isnull=False,
-        content__content_text__isnull=False,
-        embedding_e5_large__isnull=True,
-    ).select_related('content')[:limit]
-    for article in articles:
+    if batch_size:
+        # claim-based, so it is safe to run next to other backfill workers
+        return service.save_claimed_embeddings(articles=service.get_articles_to_embed(), limit=limit, batch_size=batch_size)
+
+    for article in service.get_articles_to_embed()[:limit]:
         service.save_article_embedding(article=article)
+    return None
+
+
+def refresh_stale_articles_embedding(limit: int = 1000, batch_size: int = 32) -> EmbeddingBackfillStats:
+    service = EmbeddingIngestService()
+    return service.save_claimed_embeddings(articles=service.get_stale_articles(), limit=limit, batch_size=batch_size)
 
 
 @shared_task(name='embedding_new_articles_task', ignore_result=True)
-def embedding_articles_task(limit: int = 1000):
-    cold_start_articles_embedding(limit=limit)
+def embedding_articles_task(limit: int = 1000, batch_size: Optional[int] = None):
+    if batch_size:
+        # extra workers drain the same backlog in parallel; this one is worker #1
+        for _ in range(settings.SEMANTIC_EMBEDDING_WORKERS - 1):
+            embedding_backfill_worker_task.delay(limit=limit, batch_size=batch_size)
+    cold_start_articles_embedding(limit=limit, batch_size=batch_size)
+    refresh_stale_articles_embedding(limit=limit, batch_size=batch_size or 32)
+
+
+@shared_task(name='embedding_backfill_worker_task', ignore_result=True)
+def embedding_backfill_worker_task(limit: int = 1000, batch_size: int = 32):
+    cold_start_articles_embedding(limit=limit, batch_size=batch_size)
+
+
+@shared_task(name='vector_index_maintenance_task', ignore_result=True)
+def vector_index_maintenance_task(force: bool = False):
+    VectorIndexMaintenance().run(force=force)
@@ -1,3 +1,273 @@
-from django.test import TestCase
+import base64
+import struct
+import threading
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.db.models import Q
+from django.test import RequestFactory, SimpleTestCase
+from django.utils import timezone
+
+from semantic.batching import QueryBatcher
+from semantic.cache import BoundedCache
+from semantic.filters import ArticleFilter
+from semantic.knn import KnnGraphService
+from semantic.search import InvalidCursor, SearchService, decode_cursor, encode_cursor, page_key
+from semantic.views import _filters
+from semantic.writer import PGCOPY_HEADER, PGCOPY_TRAILER, EmbeddingBulkWriter
+
+
+class EmbeddingBulkWriterCopyStreamTests(SimpleTestCase):
+    def setUp(self):
+        self.writer = EmbeddingBulkWriter()
+        self.dimensions = self.writer.dimensions
+        self.reduced_dimensions = self.writer.reduced_dimensions
+
+    def test_header_and_trailer(self):
+        stream = self.writer.build_copy_stream([1], ['a' * 64], np.zeros((1, self.dimensions), dtype=np.float32))
+        self.assertTrue(stream.startswith(b'PGCOPY\n\xff\r\n\x00'))
+        self.assertEqual(stream[11:19], struct.pack('>ii', 0, 0))
+        self.assertEqual(PGCOPY_HEADER, stream[:19])
+        self.assertTrue(stream.endswith(PGCOPY_TRAILER))
+        self.assertEqual(PGCOPY_TRAILER, b'\xff\xff')
+
+    def test_row_layout_is_big_endian(self):
+        vectors = np.arange(2 * self.dimensions, dtype=np.float32).reshape(2, self.dimensions) / 7
+        hashes = ['0' * 64, 'f' * 64]
+        stream = self.writer.build_copy_stream([42, 2 ** 40], hashes, vectors)
+
+        row_size = 2 + (4 + 8) + (4 + 64) + (4 + 2 + 2 + 4 * self.dimensions)
+        self.assertEqual(len(stream), len(PGCOPY_HEADER) + 2 * row_size + len(PGCOPY_TRAILER))
+
+        for i, article_id in enumerate([42, 2 ** 40]):
+            row = stream[len(PGCOPY_HEADER) + i * row_size:len(PGCOPY_HEADER) + (i + 1) * row_size]
+            offset = 0
+            self.assertEqual(struct.unpack_from('>h', row, offset), (3,))
+            offset += 2
+            self.assertEqual(struct.unpack_from('>iq', row, offset), (8, article_id))
+            offset += 12
+            self.assertEqual(struct.unpack_from('>i', row, offset), (64,))
+            self.assertEqual(row[offset + 4:offset + 68], hashes[i].encode())
+            offset += 68
+            self.assertEqual(struct.unpack_from('>ihh', row, offset), (4 + 4 * self.dimensions, self.dimensions, 0))
+            offset += 8
+            values = struct.unpack_from(f'>{self.dimensions}f', row, offset)
+            np.testing.assert_array_equal(np.asarray(values, dtype=np.float32), vectors[i])
+
+    def test_reduced_vector_adds_fourth_field(self):
+        stream = self.writer.build_copy_stream(
+            [7],
+            ['b' * 64],
+            np.ones((1, self.dimensions), dtype=np.float32),
+            reduced=np.full((1, self.reduced_dimensions), -0.5, dtype=np.float32),
+        )
+        row = stream[len(PGCOPY_HEADER):-len(PGCOPY_TRAILER)]
+        self.assertEqual(struct.unpack_from('>h', row, 0), (4,))
+
+        reduced_offset = 2 + 12 + 68 + 8 + 4 * self.dimensions
+        self.assertEqual(
+            struct.unpack_from('>ihh', row, reduced_offset),
+            (4 + 4 * self.reduced_dimensions, self.reduced_dimensions, 0),
+        )
+        self.assertEqual(struct.unpack_from('>f', row, reduced_offset + 8), (-0.5,))
+        self.assertEqual(len(row), reduced_offset + 8 + 4 * self.reduced_dimensions)
+
+
+class SearchFilterParamsTests(SimpleTestCase):
+    def filters(self, **params):
+        return _filters(RequestFactory().get('/', params))
+
+    def test_date_only_upper_bound_includes_the_whole_day(self):
+        filters = self.filters(published_from='2026-10-17', published_to='2026-10-18')
+        self.assertEqual(filters['published_from'], timezone.make_aware(datetime(2026, 10, 17)))
+        self.assertEqual(filters['published_to'], timezone.make_aware(datetime(2026, 10, 19)))
+
+    def test_datetime_upper_bound_is_kept_exact(self):
+        filters = self.filters(published_to='2026-10-18T12:30:00+00:00')
+        self.assertEqual(filters['published_to'], datetime(2026, 10, 18, 12, 30, tzinfo=dt_timezone.utc))
+
+    def test_malformed_values_are_ignored(self):
+        filters = self.filters(site='\u00b2', category='-1', published_to='2026-13-40')
+        self.assertIsNone(filters['site_id'])
+        self.assertIsNone(filters['category_id'])
+        self.assertIsNone(filters['published_to'])
+
+    def test_integer_ids(self):
+        filters = self.filters(site='3', category='12')
+        self.assertEqual((filters['site_id'], filters['category_id']), (3, 12))
+
+
+def hit(article_id, score):
+    return {'article_id': article_id, 'url': f'https://example.com/{article_id}', 'title': str(article_id), 'score': score}
+
+
+class SearchCursorTests(SimpleTestCase):
+    def test_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor(hit(17, 0.8123456789))), (0.8123456789, 17))
+
+    def test_malformed_cursors(self):
+        for cursor in ['', '!!!', base64.urlsafe_b64encode(b'not json').decode(), base64.urlsafe_b64encode(b'{"s": 1}').decode()]:
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                decode_cursor(cursor)
+
+    def test_page_key_breaks_score_ties_by_article_id(self):
+        hits = [hit(3, 0.5), hit(1, 0.9), hit(2, 0.5), hit(4, 0.7)]
+        self.assertEqual([h['article_id'] for h in sorted(hits, key=page_key)], [1, 4, 2, 3])
+
+
+class SearchPageTests(SimpleTestCase):
+    hits = [hit(1, 0.9), hit(5, 0.8), hit(2, 0.8), hit(7, 0.6), hit(3, 0.5)]
+
+    def page(self, hits, cursor=None):
+        with mock.patch.object(SearchService, 'ranked', return_value=list(hits)):
+            return SearchService().search_page('query', limit=2, cursor=cursor)
+
+    def test_pages_cover_the_ranked_list_once(self):
+        seen, cursor = [], None
+        while True:
+            page = self.page(self.hits, cursor)
+            seen += [h['article_id'] for h in page['results']]
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(seen, [1, 2, 5, 7, 3])
+
+    def test_resumes_after_the_cursor_when_its_hit_is_gone(self):
+        first = self.page(self.hits)
+        self.assertEqual([h['article_id'] for h in first['results']], [1, 2])
+        recomputed = [h for h in self.hits if h['article_id'] != 2] + [hit(9, 0.85)]
+        second = self.page(recomputed, first['next_cursor'])
+        self.assertEqual([h['article_id'] for h in second['results']], [5, 7])
+
+    def test_empty_query(self):
+        self.assertEqual(SearchService().search_page('  '), {'results': [], 'next_cursor': None})
+
+
+class ArticleFilterTests(SimpleTestCase):
+    published_from = datetime(2026, 10, 1, tzinfo=dt_timezone.utc)
+    published_to = datetime(2026, 10, 19, tzinfo=dt_timezone.utc)
+
+    def test_empty_values_are_dropped(self):
+        article_filter = ArticleFilter({'site_id': None, 'category_id': None})
+        self.assertFalse(article_filter)
+        self.assertEqual(article_filter.sql(), ('TRUE', []))
+        self.assertEqual(article_filter.q(), Q())
+
+    def test_sql(self):
+        article_filter = ArticleFilter({
+            'site_id': 2,
+            'published_from': self.published_from,
+            'published_to': self.published_to,
+        })
+        self.assertEqual(
+            article_filter.sql('x'),
+            (
+                'TRUE AND x.site_id = %s AND x.published_at >= %s AND x.published_at < %s',
+                [2, self.published_from, self.published_to],
+            ),
+        )
+
+    @mock.patch('semantic.filters.category_subtree', return_value=[4, 8, 15])
+    def test_category_matches_its_subtree(self, subtree):
+        article_filter = ArticleFilter({'category_id': 4})
+        self.assertEqual(article_filter.sql(), ('TRUE AND a.category_id = ANY(%s)', [[4, 8, 15]]))
+        self.assertEqual(article_filter.q(), Q(article__category_id__in=[4, 8, 15]))
+        self.assertEqual(article_filter.q(prefix=''), Q(category_id__in=[4, 8, 15]))
+        subtree.assert_called_once_with(4)
+
+    def test_cache_key_ignores_order(self):
+        self.assertEqual(
+            ArticleFilter({'site_id': 1, 'published_to': self.published_to}).cache_key(),
+            ArticleFilter({'published_to': self.published_to, 'site_id': 1}).cache_key(),
+        )
+
+
+class FuseRrfTests(SimpleTestCase):
+    def test_ids_in_both_lists_rank_first(self):
+        fused = SearchService.fuse_rrf([[1, 2, 3], [3, 4]], k=60)
+        self.assertEqual(list(fused), [3, 1, 2, 4])
+        self.assertAlmostEqual(fused[3], 1 / 63 + 1 / 61)
+        self.assertAlmostEqual(fused[4], 1 / 62)
+
+
+class BoundedCacheTests(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        cache = BoundedCache(max_size=2, ttl=60)
+        cache._set('a', 1)
+        cache._set('b', 2)
+        self.assertEqual(cache._get('a'), 1)
+        cache._set('c', 3)
+        self.assertIsNone(cache._get('b'))
+        self.assertEqual((cache._get('a'), cache._get('c')), (1, 3))
+        self.assertEqual(cache.stats()['size'], 2)
+
+    def test_entries_expire(self):
+        cache = BoundedCache(max_size=2, ttl=60)
+        with mock.patch('semantic.cache.time.monotonic', return_value=1000.0):
+            cache._set('a', 1)
+        with mock.patch('semantic.cache.time.monotonic', return_value=1059.0):
+            self.assertEqual(cache._get('a'), 1)
+        with mock.patch('semantic.cache.time.monotonic', return_value=1060.0):
+            self.assertIsNone(cache._get('a'))
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (1, 1, 0))
+
+    def test_disabled_without_size_or_ttl(self):
+        self.assertFalse(BoundedCache(max_size=0).enabled)
+        self.assertFalse(BoundedCache(ttl=0).enabled)
+
+
+class QueryBatcherTests(SimpleTestCase):
+    def test_requests_queued_during_a_pass_share_the_next_one(self):
+        started, release = threading.Event(), threading.Event()
+        batches = []
+
+        def encode(texts):
+            batches.append(list(texts))
+            started.set()
+            release.wait(5)
+            return [[float(len(text))] for text in texts]
+
+        batcher = QueryBatcher(encode, max_batch_size=8, max_wait_ms=50)
+        first = batcher.submit('a')
+        self.assertTrue(started.wait(5))
+        rest = [batcher.submit(text) for text in ['bb', 'ccc', 'dddd']]
+        release.set()
+
+        self.assertEqual(first.result(5), [1.0])
+        self.assertEqual([future.result(5) for future in rest], [[2.0], [3.0], [4.0]])
+        self.assertEqual(batches, [['a'], ['bb', 'ccc', 'dddd']])
+        self.assertEqual(batcher.stats()['batches'], 2)
+
+    def test_encode_errors_reach_every_caller(self):
+        def encode(texts):
+            raise RuntimeError('model failed')
+
+        batcher = QueryBatcher(encode)
+        with self.assertRaisesMessage(RuntimeError, 'model failed'):
+            batcher.embed('a')
+
+
+class KnnTopKTests(SimpleTestCase):
+    def test_blocked_top_k_matches_brute_force(self):
+        vectors = np.random.default_rng(0).normal(size=(37, 8)).astype(np.float32)
+        service = KnnGraphService(k=5, block_size=8)
+
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        scores = normalized @ normalized.T
+        np.fill_diagonal(scores, -np.inf)
+        expected = np.argsort(-scores, axis=1)[:, :5]
+
+        for offset, block_scores, block_idx in service.top_k(vectors):
+            rows = slice(offset, offset + block_idx.shape[0])
+            np.testing.assert_array_equal(block_idx, expected[rows])
+            np.testing.assert_allclose(block_scores, np.take_along_axis(scores[rows], block_idx, axis=1), rtol=1e-5)
+
+    def test_merge_top_k_keeps_the_best_scores(self):
+        best_scores = np.array([[0.9, 0.1]], dtype=np.float32)
+        best_idx = np.array([[0, 1]], dtype=np.int64)
+        scores = np.array([[0.5, 0.95, 0.2]], dtype=np.float32)
+        merged_scores, merged_idx = KnnGraphService.merge_top_k(best_scores, best_idx, scores, offset=10, k=2)
+        self.assertEqual(set(merged_idx[0].tolist()), {0, 11})
+        self.assertEqual(sorted(merged_scores[0].tolist()), sorted([np.float32(0.9), np.float32(0.95)]))
@@ -0,0 +1,31 @@
+from __future__ import annotations
+from typing import TypedDict
+
+
+class EmbeddingBackfillStats(TypedDict):
+    articles: int
+    batches: int
+    seconds: float
+    articles_per_sec: float
+
+
+class QueryCacheStats(TypedDict):
+    size: int
+    max_size: int
+    hits: int
+    shared_hits: int
+    misses: int
+    hit_rate: float
+
+
+class SearchResultCacheStats(QueryCacheStats):
+    corpus_version: int
+
+
+class BatcherStats(TypedDict):
+    queue_depth: int
+    batches: int
+    items: int
+    avg_batch_size: float
+    max_batch_size: int
+    last_batch_size: int
@@ -1,7 +1,19 @@
 from django.urls import path
-from .views import semantic_search
+from .views import (
+    article_neighbors,
+    related_articles,
+    search_cache_stats,
+    semantic_search,
+    semantic_search_async,
+    semantic_search_batch,
+)
 
 
 urlpatterns = [
     path('search/', semantic_search, name='semantic-search'),
+    path('search/async/', semantic_search_async, name='semantic-search-async'),
+    path('search/batch/', semantic_search_batch, name='semantic-search-batch'),
+    path('search/cache-stats/', search_cache_stats, name='semantic-search-cache-stats'),
+    path('articles/<int:article_id>/related/', related_articles, name='semantic-related-articles'),
+    path('articles/<int:article_id>/neighbors/', article_neighbors, name='semantic-article-neighbors'),
 ]
\ No newline at end of file
@@ -1,11 +1,173 @@
-from django.http import JsonResponse
-from django.views.decorators.http import require_GET
-from .search import SearchService
+import json
+from datetime import datetime, time, timedelta
+from itertools import batched
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from .async_search import AsyncSearchService, InferenceOverloaded
+from .cache import get_query_embedding_cache, get_search_result_cache
+from .filters import SearchFilters
+from .indexes import SEARCH_PROFILES
+from .knn import KnnGraphService
+from .models import IngestArticleEmbedding
+from .providers import E5Provider
+from .search import InvalidCursor, SearchService, SCORING_MODES, RETRIEVAL_MODES
+
+
+def _choice(value: str, choices: tuple[str, ...]) -> str | None:
+    return value if value in choices else None
+
+
+def _int_or_none(value: str) -> int | None:
+    # isdigit() also accepts e.g. '²', which int() rejects
+    return int(value) if value.isdecimal() else None
+
+
+def _datetime_or_none(value: str, end: bool = False) -> datetime | None:
+    """
+    Full datetimes are kept as given; a date-only `end` bound becomes the next midnight,
+    since the filters compare it exclusively and the whole end day should match.
+    """
+    try:
+        # date first: parse_datetime also accepts a bare date (as midnight) on Python 3.11+
+        if (day := parse_date(value)) is not None:
+            parsed = datetime.combine(day + timedelta(days=1) if end else day, time.min)
+        else:
+            parsed = parse_datetime(value)
+    except ValueError:
+        return None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _filters(request) -> SearchFilters:
+    return {
+        'site_id': _int_or_none(request.GET.get('site', '')),
+        'category_id': _int_or_none(request.GET.get('category', '')),
+        'published_from': _datetime_or_none(request.GET.get('published_from', '')),
+        'published_to': _datetime_or_none(request.GET.get('published_to', ''), end=True),
+    }
 
 
 @require_GET
 def semantic_search(request):
-    search_service = SearchService().search(
-        query=request.GET.get('q', '')[:2000]
-    )
-    return JsonResponse({'results': search_service})
\ No newline at end of file
+    options = {
+        'query': request.GET.get('q', '')[:2000],
+        'scoring': _choice(request.GET.get('scoring', ''), SCORING_MODES),
+        'retrieval': _choice(request.GET.get('retrieval', ''), RETRIEVAL_MODES),
+        'profile': _choice(request.GET.get('profile', ''), SEARCH_PROFILES),
+        'filters': _filters(request),
+    }
+
+    # ?paginate=1 (first page) or ?cursor=<next_cursor> switch to keyset pages
+    cursor = request.GET.get('cursor')
+    if cursor or request.GET.get('paginate') == '1':
+        try:
+            page = SearchService().search_page(
+                limit=_int_or_none(request.GET.get('limit', '')) or 10,
+                cursor=cursor,
+                **options,
+            )
+        except InvalidCursor as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        return JsonResponse(page)
+
+    search_service = SearchService().search(**options)
+    return JsonResponse({'results': search_service})
+
+
+@require_GET
+async def semantic_search_async(request):
+    try:
+        results = await AsyncSearchService().search(
+            query=request.GET.get('q', '')[:2000],
+            scoring=_choice(request.GET.get('scoring', ''), SCORING_MODES),
+            retrieval=_choice(request.GET.get('retrieval', ''), RETRIEVAL_MODES),
+            profile=_choice(request.GET.get('profile', ''), SEARCH_PROFILES),
+            filters=_filters(request),
+        )
+    except InferenceOverloaded as e:
+        response = JsonResponse({'error': str(e)}, status=503)
+        response['Retry-After'] = '1'
+        return response
+    return JsonResponse({'results': results})
+
+
+@csrf_exempt
+@require_POST
+def semantic_search_batch(request):
+    """
+    Body: {"queries": [...], "limit": 10, "profile": "..."}.
+    Streams one NDJSON line per query, in input order, as each chunk of
+    SEMANTIC_BATCH_SEARCH_CHUNK queries finishes (one forward pass + one SQL per chunk).
+    """
+    try:
+        payload = json.loads(request.body or b'{}')
+        if not isinstance(payload.get('queries'), list) or not all(isinstance(q, str) for q in payload['queries']):
+            raise TypeError('queries must be a list of strings')
+        queries = [query[:2000] for query in payload['queries']]
+        limit = int(payload.get('limit', 10))
+    except (ValueError, TypeError, AttributeError):
+        return JsonResponse({'error': 'Expected {"queries": [str, ...], "limit": int}'}, status=400)
+    if len(queries) > settings.SEMANTIC_BATCH_SEARCH_MAX_QUERIES:
+        return JsonResponse({'error': f'At most {settings.SEMANTIC_BATCH_SEARCH_MAX_QUERIES} queries per request'}, status=400)
+
+    profile = _choice(str(payload.get('profile', '')), SEARCH_PROFILES)
+    service = SearchService()
+    chunks = [list(chunk) for chunk in batched(queries, settings.SEMANTIC_BATCH_SEARCH_CHUNK)]
+
+    def lines(chunk, results):
+        for query, hits in zip(chunk, results):
+            yield json.dumps({'query': query, 'results': hits}, ensure_ascii=False) + '\n'
+
+    def stream():
+        for chunk in chunks:
+            yield from lines(chunk, service.search_many(chunk, limit=limit, profile=profile))
+
+    async def astream():
+        # ASGI buffers a sync iterator whole before sending; an async one streams per chunk
+        for chunk in chunks:
+            for line in lines(chunk, await sync_to_async(service.search_many)(chunk, limit=limit, profile=profile)):
+                yield line
+
+    content = astream() if isinstance(request, ASGIRequest) else stream()
+    return StreamingHttpResponse(content, content_type='application/x-ndjson')
+
+
+@require_GET
+def related_articles(request, article_id: int):
+    try:
+        results = SearchService().related(
+            article_id=article_id,
+            limit=_int_or_none(request.GET.get('limit', '')) or 10,
+            filters=_filters(request),
+            profile=_choice(request.GET.get('profile', ''), SEARCH_PROFILES),
+        )
+    except IngestArticleEmbedding.DoesNotExist as e:
+        raise Http404(str(e))
+    return JsonResponse({'results': results})
+
+
+@require_GET
+def article_neighbors(request, article_id: int):
+    # precomputed graph, see `manage.py build_knn_graph`
+    limit = min(_int_or_none(request.GET.get('limit', '')) or settings.SEMANTIC_KNN_K, settings.SEMANTIC_KNN_K)
+    return JsonResponse({'results': KnnGraphService.neighbors(article_id, limit=limit)})
+
+
+@require_GET
+def search_cache_stats(request):
+    # per process: each worker keeps its own in-process layer
+    batcher = E5Provider.loaded_query_batcher()
+    return JsonResponse({
+        'results': get_search_result_cache().stats(),
+        'query_embeddings': get_query_embedding_cache().stats(),
+        'query_batcher': batcher.stats() if batcher else None,
+    })
@@ -0,0 +1,128 @@
+from __future__ import annotations
+import io
+import struct
+from typing import Optional, Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+from django.db import connection, transaction
+
+from ingest.models import Article
+from ingest.services.corpus_version import CorpusVersion
+from .models import IngestArticleEmbedding
+
+
+PGCOPY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0)
+PGCOPY_TRAILER = struct.pack('>h', -1)
+
+STAGING_TABLE = 'semantic_embedding_staging'
+
+
+def _vector_fields(name: str, dimensions: int) -> list[tuple]:
+    # pgvector binary format: int16 dim, int16 unused, float32[dim] (big-endian)
+    return [
+        (f'{name}_len', '>i4'),
+        (f'{name}_dim', '>i2'),
+        (f'{name}_unused', '>i2'),
+        (name, '>f4', (dimensions,)),
+    ]
+
+
+class EmbeddingBulkWriter:
+    """
+    Write IngestArticleEmbedding rows straight from NumPy matrices.
+
+    Rows are packed into a binary COPY stream with a structured dtype (no per-float
+    Python objects), copied into a temporary staging table and merged with one
+    INSERT ... ON CONFLICT (article_id) DO UPDATE. Rows whose article no longer
+    exists are dropped by the merge instead of failing the batch.
+    """
+    table = IngestArticleEmbedding._meta.db_table
+    dimensions: int = IngestArticleEmbedding._meta.get_field('vector').dimensions
+    reduced_dimensions: int = IngestArticleEmbedding.REDUCED_DIMENSIONS
+
+    def _row_dtype(self, with_reduced: bool) -> np.dtype:
+        fields: list[tuple] = [
+            ('nfields', '>i2'),
+            ('article_id_len', '>i4'),
+            ('article_id', '>i8'),
+            ('text_hash_len', '>i4'),
+            ('text_hash', 'S64'),
+        ]
+        fields += _vector_fields('vector', self.dimensions)
+        if with_reduced:
+            fields += _vector_fields('vector_reduced', self.reduced_dimensions)
+        return np.dtype(fields)
+
+    def _pack_vector(self, rows: np.ndarray, name: str, matrix: NDArray[np.float32], dimensions: int) -> None:
+        rows[f'{name}_len'] = 4 + 4 * dimensions
+        rows[f'{name}_dim'] = dimensions
+        rows[f'{name}_unused'] = 0
+        rows[name] = matrix
+
+    def build_copy_stream(
+        self,
+        article_ids: Sequence[int],
+        text_hashes: Sequence[str],
+        vectors: NDArray[np.float32],
+        reduced: Optional[NDArray[np.float32]] = None,
+    ) -> bytes:
+        rows = np.zeros(len(article_ids), dtype=self._row_dtype(with_reduced=reduced is not None))
+        rows['nfields'] = 4 if reduced is not None else 3
+        rows['article_id_len'] = 8
+        rows['article_id'] = article_ids
+        rows['text_hash_len'] = 64
+        rows['text_hash'] = [h.encode() for h in text_hashes]
+        self._pack_vector(rows, 'vector', vectors, self.dimensions)
+        if reduced is not None:
+            self._pack_vector(rows, 'vector_reduced', reduced, self.reduced_dimensions)
+        return PGCOPY_HEADER + rows.tobytes() + PGCOPY_TRAILER
+
+    def write(
+        self,
+        article_ids: Sequence[int],
+        text_hashes: Sequence[str],
+        vectors: NDArray[np.float32],
+        model_name: str = IngestArticleEmbedding.MODEL,
+        reduced: Optional[NDArray[np.float32]] = None,
+        projection_version: Optional[int] = None,
+    ) -> int:
+        if not len(article_ids):
+            return 0
+        if any(len(h) != 64 for h in text_hashes):
+            raise ValueError('text_hashes must be 64-char hex sha256 digests')
+
+        stream = io.BytesIO(self.build_copy_stream(article_ids, text_hashes, vectors, reduced))
+        columns = 'article_id, text_hash, vector' + (', vector_reduced' if reduced is not None else '')
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            # several writes may share one outer transaction (ON COMMIT DROP only fires at its end)
+            cursor.execute(f'''
+                CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (
+                    article_id bigint,
+                    text_hash text,
+                    vector vector({self.dimensions}),
+                    vector_reduced vector({self.reduced_dimensions})
+                ) ON COMMIT DROP
+            ''')
+            cursor.execute(f'TRUNCATE {STAGING_TABLE}')
+            cursor.copy_expert(f'COPY {STAGING_TABLE} ({columns}) FROM STDIN WITH (FORMAT binary)', stream)
+            cursor.execute(
+                f'''
+                INSERT INTO {self.table} (article_id, vector, model_name, text_hash, vector_reduced, projection_version, created_at)
+                SELECT s.article_id, s.vector, %s, s.text_hash, s.vector_reduced, %s, now()
+                FROM {STAGING_TABLE} AS s
+                JOIN {Article._meta.db_table} AS a ON a.id = s.article_id
+                ON CONFLICT (article_id) DO UPDATE SET
+                    vector = EXCLUDED.vector,
+                    model_name = EXCLUDED.model_name,
+                    text_hash = EXCLUDED.text_hash,
+                    vector_reduced = EXCLUDED.vector_reduced,
+                    projection_version = EXCLUDED.projection_version,
+                    created_at = EXCLUDED.created_at
+                ''',
+                [model_name, projection_version if reduced is not None else None],
+            )
+            written = cursor.rowcount
+            CorpusVersion().bump()
+        return written